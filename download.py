@@ -1,81 +1,511 @@
+import asyncio
+import aiohttp
 import pytubefix
+import pytubefix.request
 import os
+import re
+import threading
+import time
+import shutil
+import tempfile
 import requests
 
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
 from track import Track
 
 
-def download(video_url: str, audio_output_folder = os.path.join(os.getcwd(), "temp_download"), 
-             thumbnail_output_folder = os.path.join(os.getcwd(), "temp_download")) -> tuple[str, str, list[Track]]:
+# Shared session so successive downloads reuse warm TCP/TLS connections for the lifetime of the process.
+# The pool is sized for a couple of concurrent jobs each running a full set of range workers.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# (connect, read) timeouts in seconds for every request made through the session
+_TIMEOUT = (5, 30)
+
+# Size of each ranged request made against an audio stream, and how many of them run at once.
+# Kept small enough that YouTube does not start rate limiting the connections.
+_RANGE_SIZE = 9 * 1024 * 1024
+_MAX_RANGE_WORKERS = 6
+
+# Default size of each read from a download and each write to disk, overridable with DOWNLOAD_CHUNK_SIZE
+_DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Files written with os.open must be opened in binary mode on Windows
+_O_BINARY = getattr(os, 'O_BINARY', 0)
+
+# Serial pytubefix downloads (used when the stream size is unknown) default to 9 MB ranges.
+# Larger ranges mean fewer round trips per file; pytubefix reads this at call time.
+pytubefix.request.default_range_size = 20 * 1024 * 1024
+
+# Extracts the 11 character video id from the usual YouTube URL shapes.
+_YTID_RE = re.compile(r'(?:v=|youtu\.be/|shorts/|embed/|live/)([A-Za-z0-9_-]{11})')
+
+# Parsed videos keyed by video id so retries and duplicate messages skip the page fetch and decipher.
+# YouTube's signed stream URLs expire after a few hours, so entries are only reused for an hour.
+_VIDEO_CACHE_TTL = 60 * 60
+_VIDEO_CACHE_SIZE = 128
+_video_cache: OrderedDict[str, tuple[float, pytubefix.YouTube, str, list[tuple[str, int, int]]]] = OrderedDict()
+_video_cache_lock = threading.Lock()
+
+# Number of videos kept in the download cache. Mix audio is large, so only recent videos are kept.
+# Videos used within the last hour are kept regardless, jobs read their files straight from the cache.
+_DOWNLOAD_CACHE_SIZE = 8
+_CACHE_MIN_AGE = 60 * 60
+
+# Lock per download cache folder, so pruning never races another prune or a video being marked as used
+_cache_locks: dict[str, threading.Lock] = {}
+_cache_locks_lock = threading.Lock()
+
+# Runs audio downloads that callers chose not to wait for, created on first use by _audio_executor
+_audio_executor_instance: ThreadPoolExecutor | None = None
+_audio_executor_lock = threading.Lock()
+
+# Folders already created by this process
+_ensured_folders: set[str] = set()
+
+def download(video_url: str, audio_output_folder: str | None = None,
+             cache_folder: str | None = None,
+             wait_for_audio: bool = True) -> tuple[str | Future[str], str, list[Track]]:
     """Downloads a YouTube video's audio and thumbnail.
     
     Args:
         video_url (str): The URL of the YouTube video to download
-        download_audio_folder (str, optional): Path where the audio file will be saved. Defaults to "temp_download"
-        download_thumbnail_folder (str, optional): Path where the thumbnail will be saved. Defaults to "temp_download"
+        audio_output_folder (str, optional): Folder the download cache is kept in by default. Defaults to "temp_download"
+        cache_folder (str, optional): Folder holding the download cache. Defaults to "cache" inside audio_output_folder
+        wait_for_audio (bool, optional): When False, return as soon as the thumbnail and chapters are ready and
+            keep downloading the audio in the background. Defaults to True
         
     Returns:
-        tuple[str, str, list[track.Track]]: A tuple containing:
-            - Path to the downloaded audio file
+        tuple[str | Future[str], str, list[track.Track]]: A tuple containing:
+            - Path to the downloaded audio file, or a future resolving to it when not waiting for the audio
             - Path to the downloaded thumbnail image 
             - List of chapters as custom track object if available
             
     Raises:
         Exception: If the provided URL is invalid
     """
+    return asyncio.run(download_async(video_url, audio_output_folder,
+                                      cache_folder=cache_folder, wait_for_audio=wait_for_audio))
+
+
+async def download_async(video_url: str, audio_output_folder: str | None = None,
+                         session: aiohttp.ClientSession | None = None,
+                         cache_folder: str | None = None,
+                         wait_for_audio: bool = True) -> tuple[str | Future[str], str, list[Track]]:
+    """Async version of download that fetches the audio and thumbnail concurrently.
+    
+    Files are downloaded into a per video cache folder and returned from there, so processing the same
+    video again skips the network entirely and jobs working on different videos never share a file.
+    
+    Args:
+        video_url (str): The URL of the YouTube video to download
+        audio_output_folder (str, optional): Folder the download cache is kept in by default. Defaults to "temp_download"
+        session (aiohttp.ClientSession, optional): Session used to fetch the thumbnail on the event loop.
+            When omitted the thumbnail is downloaded with requests in a worker thread.
+        cache_folder (str, optional): Folder holding the download cache. Defaults to "cache" inside audio_output_folder
+        wait_for_audio (bool, optional): When False, return as soon as the thumbnail and chapters are ready and
+            keep downloading the audio in the background. Defaults to True
+        
+    Returns:
+        tuple[str | Future[str], str, list[track.Track]]: Same as download
+            
+    Raises:
+        Exception: If the provided URL is invalid
+    """
+    if audio_output_folder is None:
+        audio_output_folder = _default_folder()
+    if cache_folder is None:
+        cache_folder = os.path.join(audio_output_folder, "cache")
+    # Normalise once so every path built from these is clean for the OS and for ffmpeg
+    cache_folder = os.path.normpath(cache_folder)
+
     print(f"Downloading video: {video_url}")
+    # pytubefix fetches the video page lazily and synchronously, so keep it off the event loop.
+    video, thumbnail_url, tracks = await asyncio.to_thread(_load_video, video_url)
+    
+    cache_dir = os.path.join(cache_folder, video.video_id)
+    # Mark the video as recently used so pruning keeps it while it is being worked on.
+    # Not ensure_folder, the folder may have been pruned since this process last created it.
+    use_cache_folder(cache_dir)
+    thumbnail = os.path.join(cache_dir, "cover.jpeg")
+
+    audio = None
+    if not wait_for_audio:
+        # Let the caller start on the chapters while the (much larger) audio is still downloading
+        audio = _audio_executor().submit(_download_cached_audio, video, cache_dir)
+
+    # Downloads are renamed into place once complete, so an existing file is a complete one.
+    async with asyncio.TaskGroup() as group:
+        if audio is None:
+            audio_task = group.create_task(asyncio.to_thread(_download_cached_audio, video, cache_dir))
+        if not os.path.exists(thumbnail):
+            if session:
+                group.create_task(download_thumbnail_async(session, thumbnail_url, cache_dir))
+            else:
+                group.create_task(asyncio.to_thread(download_thumbnail, thumbnail_url, cache_dir))
+
+    if audio is None:
+        audio = audio_task.result()
+
+    # Removing old videos is disk I/O, keep it off the event loop
+    await asyncio.to_thread(prune_cache, cache_folder)
+
+    return (audio, thumbnail, tracks)
+
+
+def _download_cached_audio(video: pytubefix.YouTube, cache_dir: str) -> str:
+    """Downloads a video's audio into its cache folder unless already there.
+    
+    Args:
+        video (pytubefix.YouTube): The YouTube video object to download audio from
+        cache_dir (str): Cache folder of the video
+        
+    Returns:
+        str: Path to the audio file inside the cache folder
+    """
+    audio = os.path.join(cache_dir, "audio.mp3")
+    if not os.path.exists(audio):
+        download_audio(video, cache_dir)
+    return audio
+
+
+def use_cache_folder(path: str) -> None:
+    """Creates a video's folder in a download cache if needed and marks it as recently used, so pruning keeps it.
+    
+    Unlike ensure_folder nothing is remembered, since prune_cache may remove the folder again later.
+    
+    Args:
+        path (str): Folder of the video inside the cache
+    """
+    # Under the cache's lock, so prune_cache cannot remove the folder between the two calls
+    with _cache_lock(os.path.dirname(path)):
+        os.makedirs(path, exist_ok=True)
+        os.utime(path)
+
+
+def prune_cache(cache_folder: str, size: int = _DOWNLOAD_CACHE_SIZE) -> None:
+    """Removes all but the most recently used videos from a download cache.
+    
+    Videos used in the last _CACHE_MIN_AGE seconds are always kept, since a job may still be reading them.
+    
+    Args:
+        cache_folder (str): Folder holding one folder per video
+        size (int, optional): Number of videos to keep. Defaults to _DOWNLOAD_CACHE_SIZE
+    """
+    # Several download workers may prune the same cache at once, so one prunes while the others wait
+    with _cache_lock(cache_folder):
+        now = time.time()
+        entries = []
+        with os.scandir(cache_folder) as scan:
+            for entry in scan:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    # Removed since the folder was listed
+                    continue
+        entries.sort(reverse=True)
+        for modified, path in entries[size:]:
+            if now - modified > _CACHE_MIN_AGE:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _cache_lock(cache_folder: str) -> threading.Lock:
+    """Returns the lock serialising changes to a download cache folder."""
+    with _cache_locks_lock:
+        return _cache_locks.setdefault(os.path.abspath(cache_folder), threading.Lock())
+
+
+def _audio_executor() -> ThreadPoolExecutor:
+    """Returns the pool for background audio downloads, one thread per mix processed at the same time."""
+    global _audio_executor_instance
+    with _audio_executor_lock:
+        if _audio_executor_instance is None:
+            # Read on first use since the .env file is loaded after this module is imported
+            workers = int(os.getenv('WORKER_CONCURRENCY', '2'))
+            _audio_executor_instance = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-download")
+        return _audio_executor_instance
+
+
+def ensure_folder(path: str) -> None:
+    """Creates a folder if this process has not already done so.
+    
+    Args:
+        path (str): Folder to create
+    """
+    path = os.path.abspath(path)
+    if path not in _ensured_folders:
+        os.makedirs(path, exist_ok=True)
+        _ensured_folders.add(path)
+
+
+def _default_folder() -> str:
+    """Returns the default download folder, resolved against the working directory at call time."""
+    return os.path.join(os.getcwd(), "temp_download")
+
+
+def _load_video(video_url: str) -> tuple[pytubefix.YouTube, str, list[Track]]:
+    """Fetches a YouTube video's metadata, reusing recently parsed videos.
+    
+    Args:
+        video_url (str): The URL of the YouTube video
+        
+    Returns:
+        tuple[pytubefix.YouTube, str, list[track.Track]]: The video, its thumbnail URL and its chapters as tracks
+            
+    Raises:
+        Exception: If the provided URL is invalid
+    """
+    match = _YTID_RE.search(video_url)
+    if not match:
+        # Let pytubefix decide whether this is a valid URL
+        video, thumbnail_url, chapters = _fetch_video(video_url)
+    else:
+        video_id = match.group(1)
+        with _video_cache_lock:
+            entry = _video_cache.get(video_id)
+            if entry and time.monotonic() - entry[0] < _VIDEO_CACHE_TTL:
+                _video_cache.move_to_end(video_id)
+            else:
+                entry = None
+
+        if entry:
+            _, video, thumbnail_url, chapters = entry
+        else:
+            video, thumbnail_url, chapters = _fetch_video(f"https://www.youtube.com/watch?v={video_id}")
+            with _video_cache_lock:
+                _video_cache[video_id] = (time.monotonic(), video, thumbnail_url, chapters)
+                _video_cache.move_to_end(video_id)
+                while len(_video_cache) > _VIDEO_CACHE_SIZE:
+                    _video_cache.popitem(last=False)
+
+    # Build fresh tracks every time since the splitter edits them in place
+    tracks = [Track(title, start, duration) for title, start, duration in chapters]
+
+    return (video, thumbnail_url, tracks)
+
+
+def _fetch_video(video_url: str) -> tuple[pytubefix.YouTube, str, list[tuple[str, int, int]]]:
+    """Fetches and parses a YouTube video page.
+    
+    Args:
+        video_url (str): The URL of the YouTube video
+        
+    Returns:
+        tuple[pytubefix.YouTube, str, list[tuple[str, int, int]]]: The video, its thumbnail URL and
+            its chapters as (title, start, duration) tuples
+            
+    Raises:
+        Exception: If the provided URL is invalid
+    """
     try:
         video = pytubefix.YouTube(video_url)
     except pytubefix.exceptions.RegexMatchError:
         raise Exception("Invalid URL")
-    
-    os.makedirs(audio_output_folder, exist_ok=True)
-    os.makedirs(thumbnail_output_folder, exist_ok=True)
-    
-    audio = download_audio(video, audio_output_folder)
-    thumbnail = download_thumbnail(video.thumbnail_url, thumbnail_output_folder)
-    video_chapters = video.chapters
-
-    tracks = []
-    for chapter in video_chapters:
-        track = Track(chapter.title, chapter.start_seconds, chapter.duration)
-        tracks.append(track)
 
-    return (audio, thumbnail, tracks)
+    chapters = [(chapter.title, chapter.start_seconds, chapter.duration) for chapter in video.chapters]
+    return (video, video.thumbnail_url, chapters)
 
 
-def download_audio(video: pytubefix.YouTube, output_folder = os.path.join(os.getcwd(), "temp_download")) -> str:
+def download_audio(video: pytubefix.YouTube, output_folder: str | None = None) -> str:
     """Downloads the audio stream from a YouTube video.
     
     Args:
         video (pytubefix.YouTube): The YouTube video object to download audio from
-        download_folder (str, optional): Path where the audio file will be saved. Defaults to "\temp_download\"
+        output_folder (str, optional): Path where the audio file will be saved. Defaults to "temp_download"
         
     Returns:
         str: Path to the downloaded audio file
     """
+    if output_folder is None:
+        output_folder = _default_folder()
+
     audio_stream = video.streams.get_audio_only()
-    audio_stream.download(output_folder, "audio.mp3")
-    return os.path.join(output_folder, "audio.mp3")
+    audio_path = os.path.join(output_folder, "audio.mp3")
+    # Download under a temporary name and rename once complete, so a partial file is never mistaken for
+    # a finished one. The name is unique, so two jobs downloading the same video never write into one file.
+    part_path = _part_path(audio_path)
+    try:
+        size = audio_stream.filesize
+        if not size:
+            # Without a known size the ranges cannot be planned, so let pytubefix download it serially.
+            audio_stream.download(output_folder, os.path.basename(part_path), skip_existing=False)
+        else:
+            # Pre-size the file so every range can be written at its own offset.
+            fd = os.open(part_path, os.O_WRONLY | _O_BINARY)
+            try:
+                _preallocate(fd, size)
+            finally:
+                os.close(fd)
+
+            ranges = [(start, min(start + _RANGE_SIZE, size) - 1) for start in range(0, size, _RANGE_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(_MAX_RANGE_WORKERS, len(ranges))) as executor:
+                futures = [executor.submit(_download_range, audio_stream.url, part_path, start, end) for start, end in ranges]
+                for future in futures:
+                    # Re-raise the first failed range
+                    future.result()
+
+        os.replace(part_path, audio_path)
+    except BaseException:
+        _remove_part(part_path)
+        raise
+    return audio_path
+
+
+def _part_path(path: str) -> str:
+    """Creates an empty, uniquely named file next to path to download into before renaming it to path."""
+    fd, part_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".part")
+    os.close(fd)
+    # mkstemp makes the file private, keep the permissions downloads had before
+    os.chmod(part_path, 0o644)
+    return part_path
+
+
+def _remove_part(part_path: str) -> None:
+    """Removes an unfinished download, if it is still there."""
+    try:
+        os.remove(part_path)
+    except FileNotFoundError:
+        pass
+
+
+def _download_range(url: str, path: str, start: int, end: int) -> None:
+    """Downloads the bytes start..end (inclusive) of a YouTube stream into the same offsets of path.
+    
+    Args:
+        url (str): Stream URL to download from
+        path (str): Pre-sized file to write into
+        start (int): First byte of the range
+        end (int): Last byte of the range
+        
+    Raises:
+        Exception: If the server returns fewer bytes than requested
+    """
+    # YouTube serves ranges through the range query parameter, the same way pytubefix requests them.
+    with _SESSION.get(f"{url}&range={start}-{end}", headers={"User-Agent": "Mozilla/5.0"}, stream=True, timeout=_TIMEOUT) as response:
+        response.raise_for_status()
+        # Each range gets its own descriptor so the fallback seek + write cannot race with other ranges
+        fd = os.open(path, os.O_WRONLY | _O_BINARY)
+        try:
+            written = _stream_to_disk(response, fd, start)
+        finally:
+            os.close(fd)
 
+    if written != end - start + 1:
+        raise Exception(f"Incomplete download of bytes {start}-{end}: received {written} bytes")
 
-def download_thumbnail(thumbnail_url: str, output_folder = os.path.join(os.getcwd(), "temp_download")) -> str:
+
+def download_thumbnail(thumbnail_url: str, output_folder: str | None = None) -> str:
     """Downloads a thumbnail image from a YouTube video.
     
     Args:
         thumbnail_url (str): URL of the thumbnail image to download
-        download_folder (str, optional): Path where the thumbnail will be saved. Defaults to "\temp_download\"
+        output_folder (str, optional): Path where the thumbnail will be saved. Defaults to "temp_download"
         
     Returns:
         str: Path to the downloaded thumbnail file
     """
-    # Use requests to download the image.
-    img_data = requests.get(thumbnail_url).content
-    # Download it to a specific folder with a specific name.
-    with open(os.path.join(output_folder, "cover.jpeg"), 'wb') as handler:
-        handler.write(img_data)
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    thumbnail_path = os.path.join(output_folder, "cover.jpeg")
+    part_path = _part_path(thumbnail_path)
+    try:
+        # Stream the image straight to disk instead of buffering the whole response in memory.
+        with _SESSION.get(thumbnail_url, stream=True, timeout=_TIMEOUT) as response, \
+                open(part_path, 'wb', buffering=0) as handler:
+            response.raise_for_status()
+            # Content-Length counts the encoded bytes, so only a body sent as is may be sized up front
+            if response.headers.get('Content-Length') and response.headers.get('Content-Encoding', 'identity') == 'identity':
+                _preallocate(handler.fileno(), int(response.headers['Content-Length']))
+            # copyfileobj moves the bytes in a C level loop rather than a Python loop over chunks
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, handler, length=_chunk_size())
+        os.replace(part_path, thumbnail_path)
+    except BaseException:
+        _remove_part(part_path)
+        raise
     # Return download location.
-    return os.path.join(output_folder, "cover.jpeg")
+    return thumbnail_path
+
+
+def _stream_to_disk(response: requests.Response, fd: int, offset: int = 0) -> int:
+    """Writes a streamed response body into a file descriptor without any intermediate buffering.
+    
+    Args:
+        response (requests.Response): Response opened with stream=True
+        fd (int): File descriptor opened for writing
+        offset (int, optional): Position in the file to start writing at. Defaults to 0
+        
+    Returns:
+        int: Number of bytes written
+    """
+    written = 0
+    for data in response.raw.stream(_chunk_size(), decode_content=True):
+        _write_at(fd, data, offset + written)
+        written += len(data)
+    return written
+
+
+def _chunk_size() -> int:
+    """Returns the configured download chunk size in bytes."""
+    # Read on every call since the .env file is loaded after this module is imported
+    return int(os.getenv('DOWNLOAD_CHUNK_SIZE', _DEFAULT_CHUNK_SIZE))
+
+
+def _write_at(fd: int, data: bytes, offset: int) -> None:
+    """Writes all of data at offset, using a positional write where the platform has one."""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, 'pwrite'):
+            count = os.pwrite(fd, view, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            count = os.write(fd, view)
+        view = view[count:]
+        offset += count
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Sizes a file up front so the filesystem can lay it out in one go."""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # Not available on Windows or on some filesystems
+        os.ftruncate(fd, size)
+
+
+async def download_thumbnail_async(session: aiohttp.ClientSession, thumbnail_url: str, output_folder: str | None = None) -> str:
+    """Downloads a thumbnail image from a YouTube video without blocking the event loop.
+    
+    Args:
+        session (aiohttp.ClientSession): Session to make the request with
+        thumbnail_url (str): URL of the thumbnail image to download
+        output_folder (str, optional): Path where the thumbnail will be saved. Defaults to "temp_download"
+        
+    Returns:
+        str: Path to the downloaded thumbnail file
+    """
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    thumbnail_path = os.path.join(output_folder, "cover.jpeg")
+    part_path = _part_path(thumbnail_path)
+    try:
+        async with session.get(thumbnail_url, raise_for_status=True) as response:
+            # Thumbnails are tens of KB, so plain writes to the page cache are fine on the loop.
+            with open(part_path, 'wb', buffering=_chunk_size()) as handler:
+                # iter_any hands over whatever has arrived instead of re-slicing it into fixed chunks
+                async for chunk in response.content.iter_any():
+                    handler.write(chunk)
+        os.replace(part_path, thumbnail_path)
+    except BaseException:
+        _remove_part(part_path)
+        raise
+    # Return download location.
+    return thumbnail_path
 
 """Tests"""
 
@@ -83,32 +513,29 @@ def test_download():
     """Test the download function."""
     # Test with a known video URL
     test_video_url = "https://www.youtube.com/watch?v=KVmtUWJmbNs"
-    test_audio_path = os.getcwd() + "\\test_downloads\\"
-    test_thumb_path = os.getcwd() + "\\test_downloads_thumbnail\\"
+    test_audio_path = os.path.join(os.getcwd(), "test_downloads")
     
     try:
         # Ensure download directories exist
         os.makedirs(test_audio_path, exist_ok=True)
-        os.makedirs(test_thumb_path, exist_ok=True)
         
         # Test download
-        audio, thumbnail, tracks = download(test_video_url, test_audio_path, test_thumb_path)
+        audio, thumbnail, tracks = download(test_video_url, test_audio_path)
         
-        # Verify audio file exists and is not empty
-        audio_file = test_audio_path + "audio.mp3"
+        # Verify audio file exists in the video's cache folder and is not empty
+        audio_file = os.path.join(test_audio_path, "cache", "KVmtUWJmbNs", "audio.mp3")
+        assert audio == audio_file, "Audio should be returned from the download cache"
         assert os.path.exists(audio_file), "Audio file was not downloaded"
         assert os.path.getsize(audio_file) > 0, "Audio file is empty"
         
         # Verify thumbnail file exists and is not empty
-        thumb_file = test_thumb_path + "cover.jpeg"
+        thumb_file = os.path.join(test_audio_path, "cache", "KVmtUWJmbNs", "cover.jpeg")
+        assert thumbnail == thumb_file, "Thumbnail should be returned from the download cache"
         assert os.path.exists(thumb_file), "Thumbnail file was not downloaded"
         assert os.path.getsize(thumb_file) > 0, "Thumbnail file is empty"
         
         # Clean up
-        os.remove(audio_file)
-        os.remove(thumb_file)
-        os.rmdir(test_audio_path)
-        os.rmdir(test_thumb_path)
+        shutil.rmtree(test_audio_path)
         
         print("Download test passed successfully!")
         
@@ -152,7 +579,7 @@ def test_download_thumbnail():
     """Test the download_thumbnail function."""
     # Test with a known thumbnail URL
     test_thumb_url = "https://img.youtube.com/vi/dQw4w9WgXcQ/maxresdefault.jpg"
-    download_path = os.getcwd() + "\\test_downloads\\"
+    download_path = os.path.join(os.getcwd(), "test_downloads")
     
     try:
         # Ensure download directory exists
@@ -1,13 +1,16 @@
 import os
-import json
+import orjson
+import atexit
 import asyncio
+import aiohttp
 from aiohttp import web
 from dotenv import load_dotenv
-import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from splitter import split
-from download import download
+from splitter import check_ffmpeg, split, warm_up_ffmpeg
+from download import download, download_async, ensure_folder
 from redis_pub_sub import RedisSubscriber, RedisPublisher
+from songs_store import RedisProcessedSongsStore
 
 
 # Load environment variables from .env file
@@ -17,13 +20,22 @@ thumbnail_folder = os.getenv('THUMBNAIL_FOLDER', os.path.join(os.getcwd(), 'temp
 output_folder = os.getenv('OUTPUT_FOLDER', os.path.join(os.getcwd(), 'output'))
 publisher = RedisPublisher(channel=os.getenv('REDIS_PUBLISH_CHANNEL', 'mix_processing_finished'))
 
-def process_message(message: dict) -> None:
+# Bounded pool for mix jobs so a burst of messages queues up instead of running every download/split at once
+EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('WORKER_CONCURRENCY', '2')))
+atexit.register(EXECUTOR.shutdown, wait=True)
+
+# Event loop running the web app and the HTTP client session shared by every job on it.
+# Both are set once the web app has started.
+main_loop = None
+http_session = None
+
+async def process_message(message: dict) -> None:
     """Handle incoming Redis messages."""
     if message['type'] != 'message':
         return
 
     try:
-        data = json.loads(message['data'])
+        data = orjson.loads(message['data'])
         video_url = data.get('video_url')
         location = data.get('location')
         
@@ -33,10 +45,10 @@ def process_message(message: dict) -> None:
 
         print(f"Processing video: {video_url}")
         print(f"Location: {location}")
-        # Run processing in a background thread (callback is invoked outside the asyncio loop)
-        threading.Thread(target=process_video, args=(video_url, location), daemon=True).start()
+        # Queue processing on the worker pool so the subscriber keeps reading messages
+        EXECUTOR.submit(process_video, video_url, location)
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Invalid JSON message received: {message['data']}")
     except Exception as e:
         print(f"Error processing message: {str(e)}")
@@ -44,8 +56,14 @@ def process_message(message: dict) -> None:
 def process_video(video_url: str, location: str) -> None:
     """Download and split the video."""
     try:
-        # Download the video and get necessary data
-        audio, thumbnail, tracks = download(video_url)
+        # Download the video and get necessary data, sharing the web app's HTTP session when it is running.
+        # The audio keeps downloading in the background while the split gets started.
+        if main_loop and http_session:
+            audio, thumbnail, tracks = asyncio.run_coroutine_threadsafe(
+                download_async(video_url, session=http_session, wait_for_audio=False), main_loop
+            ).result()
+        else:
+            audio, thumbnail, tracks = download(video_url, wait_for_audio=False)
 
         # Extra thing so we can download to other folders
         new_location = output_folder
@@ -58,10 +76,11 @@ def process_video(video_url: str, location: str) -> None:
         print(f"New Location: {new_location}")
 
         # Ensure the output directory exists
-        os.makedirs(new_location, exist_ok=True)
+        ensure_folder(new_location)
 
-        # Split the audio
-        songs = split(audio, thumbnail, tracks, thumbnail_folder, new_location)
+        # Split the audio, keeping track of processed songs in Redis so concurrent workers never split a song twice
+        songs_store = RedisProcessedSongsStore(new_location, publisher.redis_client)
+        songs = split(audio, thumbnail, tracks, thumbnail_folder, new_location, songs_store=songs_store)
         
         print(f"Successfully processed video. Output songs: {songs}")
         publisher.publish({
@@ -75,43 +94,54 @@ def process_video(video_url: str, location: str) -> None:
 async def health_check(request):
     return web.Response(text="ok")
 
+async def open_http_session(app):
+    global main_loop, http_session
+    main_loop = asyncio.get_running_loop()
+    http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(sock_connect=5, sock_read=30))
+
+async def close_http_session(app):
+    await http_session.close()
+
 async def start_web_app():
     app = web.Application()
     app.router.add_get("/health", health_check)
+    app.on_startup.append(open_http_session)
+    app.on_cleanup.append(close_http_session)
     runner = web.AppRunner(app)
     await runner.setup()
-    # Ensure the port is a valid integer; default to 8080 if not provided/invalid
-    port_str = os.getenv("HEALTH_CHECK_PORT", "8080")
     try:
-        port = int(port_str)
-    except (TypeError, ValueError):
-        port = 8080
-        print("HEALTH_CHECK_PORT is invalid; defaulting to 8080")
-    site = web.TCPSite(runner, "0.0.0.0", port)
-    await site.start()
-    print(f"Health check server running on port {port}")
-    # Keep the server running
-    stop = asyncio.Event()
-    await stop.wait()
+        # Ensure the port is a valid integer; default to 8080 if not provided/invalid
+        port_str = os.getenv("HEALTH_CHECK_PORT", "8080")
+        try:
+            port = int(port_str)
+        except (TypeError, ValueError):
+            port = 8080
+            print("HEALTH_CHECK_PORT is invalid; defaulting to 8080")
+        site = web.TCPSite(runner, "0.0.0.0", port)
+        await site.start()
+        print(f"Health check server running on port {port}")
+
+        # Listen for Redis messages on the same loop; this keeps the process alive
+        subscriber = RedisSubscriber(channel='mix_processing')
+        print(f"Starting audio processor. Listening on channel: {subscriber.channel}")
+        await subscriber.subscribe_async(callback=process_message)
+    finally:
+        # Runs the on_cleanup handlers, closing the shared HTTP session
+        await runner.cleanup()
 
 def main():
     # Ensure directories exist
-    os.makedirs(thumbnail_folder, exist_ok=True)
-    os.makedirs(output_folder, exist_ok=True)
-
-    # Initialize Redis subscriber
-    subscriber = RedisSubscriber(channel='mix_processing')
-    print(f"Starting audio processor. Listening on channel: {subscriber.channel}")
-
-    # Start Redis subscriber in a background thread (blocking loop)
-    subscriber_thread = threading.Thread(
-        target=subscriber.subscribe,
-        kwargs={"callback": process_message},
-        daemon=True,
-    )
-    subscriber_thread.start()
-
-    # Run the aiohttp web app on the main thread (keeps process alive)
+    ensure_folder(thumbnail_folder)
+    ensure_folder(output_folder)
+
+    # Fail before subscribing rather than on every mix; the result is cached for split()
+    if not check_ffmpeg():
+        raise Exception("ffmpeg is not available on the system")
+
+    # Load ffmpeg from disk now rather than on the first mix
+    warm_up_ffmpeg()
+
+    # Run the aiohttp web app and the Redis subscriber on the main thread
     asyncio.run(start_web_app())
 
 def manual_download(video_url, location = None):
@@ -125,7 +155,7 @@ def manual_download(video_url, location = None):
         new_location = os.path.join(base_folder, location)
     
     # Ensure the output directory exists
-    os.makedirs(new_location, exist_ok=True)
+    ensure_folder(new_location)
     
     # Split the audio
     songs = split(audio, thumbnail, tracks, thumbnail_folder, new_location)
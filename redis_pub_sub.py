@@ -1,11 +1,24 @@
 import redis
-import json
-from typing import Callable, Any, Union
+import redis.asyncio
+import orjson
+import threading
+from typing import Awaitable, Callable, Any, Union
+
+# Connection pools shared by every publisher and subscriber talking to the same server
+_pools: dict[tuple[str, int], redis.ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(host: str, port: int) -> redis.ConnectionPool:
+    """Return the shared connection pool for a Redis server, creating it on first use."""
+    with _pools_lock:
+        if (host, port) not in _pools:
+            _pools[(host, port)] = redis.ConnectionPool(host=host, port=port, max_connections=32, decode_responses=True)
+        return _pools[(host, port)]
 
 class RedisPublisher:
     def __init__(self, host: str = 'localhost', port: int = 6379, channel: str = 'default_channel'):
         """Initialize Redis publisher with connection details and channel name."""
-        self.redis_client = redis.Redis(host=host, port=port, decode_responses=True)
+        self.redis_client = redis.Redis(connection_pool=_get_pool(host, port))
         self.channel = channel
 
     def publish(self, message: Union[str, dict]) -> int:
@@ -14,9 +27,11 @@ class RedisPublisher:
         Returns the number of subscribers that received the message.
         """
         try:
-            # Convert dict to JSON string if necessary
+            # Encode to bytes here so the client does not have to re-encode the payload
             if isinstance(message, dict):
-                message = json.dumps(message)
+                message = orjson.dumps(message)
+            else:
+                message = message.encode('utf-8')
             
             return self.redis_client.publish(self.channel, message)
         except Exception as e:
@@ -24,23 +39,25 @@ class RedisPublisher:
             return 0
 
     def close(self):
-        """Close the Redis connection."""
+        """Release the Redis client. The shared connection pool stays open for other clients."""
         self.redis_client.close()
 
 class RedisSubscriber:
     def __init__(self, host: str = 'localhost', port: int = 6379, channel: str = 'default_channel'):
         """Initialize Redis subscriber with connection details and channel name."""
-        self.redis_client = redis.Redis(host=host, port=port, decode_responses=True)
+        self.redis_client = redis.Redis(connection_pool=_get_pool(host, port))
         self.pubsub = self.redis_client.pubsub()
         self.channel = channel
+        self.host = host
+        self.port = port
 
     def message_handler(self, message: dict) -> None:
         """Default message handler - can be overridden."""
         if message['type'] == 'message':
             try:
-                data = json.loads(message['data'])
+                data = orjson.loads(message['data'])
                 print(f"Received message: {data}")
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 print(f"Received raw message: {message['data']}")
 
     def subscribe(self, callback: Callable[[Any], None] = None) -> None:
@@ -59,6 +76,28 @@ class RedisSubscriber:
             self.pubsub.unsubscribe()
             self.redis_client.close()
 
+    async def subscribe_async(self, callback: Callable[[Any], Awaitable[None]] = None) -> None:
+        """
+        Subscribe to the channel on the running event loop and process messages.
+        The callback is awaited for every message, so it should hand off long work.
+        """
+        client = redis.asyncio.Redis(host=self.host, port=self.port, decode_responses=True)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+
+        print(f"Subscribed to channel: {self.channel}")
+        try:
+            async for message in pubsub.listen():
+                # Use custom callback if provided, otherwise use default handler
+                if callback:
+                    await callback(message)
+                else:
+                    self.message_handler(message)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await client.aclose()
+
 def test_redis_pubsub():
     """Test the Redis Publisher and Subscriber classes."""
     try:
@@ -0,0 +1,166 @@
+import os
+import threading
+import redis
+from typing import Iterable
+
+
+class ProcessedSongsStore:
+    """Remembers which songs were already processed into an output folder, in the folder's songs.txt file."""
+
+    # Serialises read-then-append across worker threads sharing a songs.txt
+    _lock = threading.Lock()
+
+    def __init__(self, output_folder: str):
+        """Initialize the store for an output folder."""
+        self.output_folder = output_folder
+        self.songs_file = os.path.join(output_folder, "songs.txt")
+
+    def songs(self) -> set[str]:
+        """
+        Return every processed song title.
+        If there is no songs.txt yet, it is created from the mp3 files already in the folder.
+        """
+        try:
+            # Read processed songs in one go
+            with open(self.songs_file, 'r', encoding='utf-8') as f:
+                return {line.strip() for line in f.read().splitlines()}
+        except FileNotFoundError:
+            pass
+
+        # scandir already knows the names, so no extra call is needed per file
+        with os.scandir(self.output_folder) as entries:
+            existing_songs = {entry.name[:-4] for entry in entries if entry.name.endswith('.mp3')}
+
+        # Write existing songs to the file
+        if existing_songs:
+            with open(self.songs_file, 'w', encoding='utf-8') as f:
+                f.write("".join(f"{song}\n" for song in existing_songs))
+        return existing_songs
+
+    def add_many(self, titles: Iterable[str]) -> set[str]:
+        """
+        Mark songs as processed.
+        Returns the titles that were not processed before, which are the ones to work on.
+        """
+        with self._lock:
+            processed_songs = self.songs()
+            new_titles = [title for title in dict.fromkeys(titles) if title not in processed_songs]
+
+            # Append new songs to the file
+            if new_titles:
+                with open(self.songs_file, 'a', encoding='utf-8') as f:
+                    f.write("".join(f"{title}\n" for title in new_titles))
+        return set(new_titles)
+
+
+class RedisProcessedSongsStore(ProcessedSongsStore):
+    """
+    Remembers processed songs in a Redis set per output folder.
+    Membership checks are O(1) and every SADD is atomic, so workers in several processes never lose each other's writes.
+    """
+
+    def __init__(self, output_folder: str, client: redis.Redis):
+        """Initialize the store for an output folder, using an existing Redis client."""
+        super().__init__(output_folder)
+        self.redis_client = client
+        self.key = f"processed:{os.path.abspath(output_folder)}"
+
+    def add_many(self, titles: Iterable[str]) -> set[str]:
+        """
+        Mark songs as processed.
+        Returns the titles that were not processed before, which are the ones to work on.
+        """
+        titles = list(dict.fromkeys(titles))
+        if not titles:
+            return set()
+
+        # The first use of a folder carries over what songs.txt or the folder itself already has
+        if not self.redis_client.exists(self.key):
+            existing_songs = super().songs()
+            if existing_songs:
+                self.redis_client.sadd(self.key, *existing_songs)
+
+        # SADD answers 1 only to the worker that actually added the title
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for title in titles:
+            pipeline.sadd(self.key, title)
+        return {title for title, added in zip(titles, pipeline.execute()) if added}
+
+    def songs(self) -> set[str]:
+        """Return every processed song title."""
+        return self.redis_client.smembers(self.key)
+
+
+def test_processed_songs_store():
+    """Test the ProcessedSongsStore class."""
+    test_dir = os.path.join(os.getcwd(), "test", "songs_store")
+    songs_file = os.path.join(test_dir, "songs.txt")
+    try:
+        os.makedirs(test_dir, exist_ok=True)
+        if os.path.exists(songs_file):
+            os.remove(songs_file)
+        with open(os.path.join(test_dir, "Existing Song.mp3"), 'w') as f:
+            f.write("dummy content")
+
+        store = ProcessedSongsStore(test_dir)
+
+        # Songs already in the folder count as processed
+        assert store.songs() == {"Existing Song"}, "Existing songs should be seeded from the folder"
+
+        # Only titles not seen before are returned, and only once
+        assert store.add_many(["Existing Song", "New Song"]) == {"New Song"}, "Should only return new songs"
+        assert store.add_many(["New Song"]) == set(), "New song should now be processed"
+        assert store.songs() == {"Existing Song", "New Song"}, "songs.txt should hold every processed song"
+
+        print("ProcessedSongsStore test passed successfully!")
+
+    except Exception as e:
+        print(f"Test failed: {str(e)}")
+        raise
+    finally:
+        for name in ("songs.txt", "Existing Song.mp3"):
+            if os.path.exists(os.path.join(test_dir, name)):
+                os.remove(os.path.join(test_dir, name))
+
+
+def test_redis_processed_songs_store():
+    """Test the RedisProcessedSongsStore class against an in-memory Redis."""
+    import fakeredis
+
+    test_dir = os.path.join(os.getcwd(), "test", "songs_store")
+    songs_file = os.path.join(test_dir, "songs.txt")
+    try:
+        os.makedirs(test_dir, exist_ok=True)
+        with open(songs_file, 'w', encoding='utf-8') as f:
+            f.write("Listed Song\n")
+
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        store = RedisProcessedSongsStore(test_dir, client)
+
+        # The first use seeds the set from songs.txt
+        assert store.add_many(["Listed Song", "New Song", "New Song"]) == {"New Song"}, "Should only return new songs"
+        assert store.songs() == {"Listed Song", "New Song"}, "The set should hold the seeded and the new songs"
+        assert store.add_many(["Listed Song", "New Song"]) == set(), "Repeated songs should not be returned again"
+        assert store.add_many([]) == set(), "No titles should give no new songs"
+
+        # Without songs.txt the set is seeded from the mp3 files in the folder
+        os.remove(songs_file)
+        with open(os.path.join(test_dir, "Existing Song.mp3"), 'w') as f:
+            f.write("dummy content")
+        store = RedisProcessedSongsStore(test_dir, fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True))
+        assert store.add_many(["Existing Song", "Other Song"]) == {"Other Song"}, "Songs in the folder should count as processed"
+
+        print("RedisProcessedSongsStore test passed successfully!")
+
+    except Exception as e:
+        print(f"Test failed: {str(e)}")
+        raise
+    finally:
+        for name in ("songs.txt", "Existing Song.mp3"):
+            if os.path.exists(os.path.join(test_dir, name)):
+                os.remove(os.path.join(test_dir, name))
+
+
+if __name__ == "__main__":
+    test_processed_songs_store()
+    test_redis_processed_songs_store()
@@ -1,28 +1,141 @@
+import io
 import os
+import asyncio
+import functools
+import shutil
 import subprocess
+import tempfile
 import wave
 import struct
 import re
+import json
+import threading
+import time
+import random
 
-from difflib import SequenceMatcher
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.error import HTTPError
 
 from PIL import Image
-from track import Track
-from pytubefix import Search
+from mutagen.id3 import ID3, TIT2, TPE1, APIC
+from track import Track, parse_artist_title
+from pytubefix import Search, YouTube
 
-from download import download_audio, download_thumbnail
+from download import _default_folder, download_audio, download_thumbnail, prune_cache, use_cache_folder
+from songs_store import ProcessedSongsStore
 
+# Start of every ffmpeg command: only report errors and always overwrite. Every command opens the audio
+# first, and the probe limits apply to that input, so ffmpeg stops probing as soon as it knows the stream
+_FFMPEG_BASE = ('ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-probesize', '32k', '-analyzeduration', '0')
+
+# Output options for an mp3 made from input 0's audio with input 1 as album art
+_FFMPEG_MP3_WITH_COVER = (
+    '-map', '0:a:0',  # Map the first audio stream
+    '-map', '1:0',  # Map the album art
+    '-map_metadata', '-1',  # Remove existing metadata
+    '-id3v2_version', '3',  # Use ID3v2.3 format
+    '-f', 'mp3',  # Specify mp3
+)
+
+# Slashes, which would make a title a path instead of a file name
+_PATH_SEPARATOR_RE = re.compile(r'[\\/]')
+
+# Track numbers like "01. " at the start of a title
+_TRACK_NUMBER_RE = re.compile(r'^\d+\.?\s*')
+
+# Memory backed folder used for intermediate segments on Linux
+_SHM_FOLDER = "/dev/shm"
+
+# YouTube searches are cached on disk for a day, keeping this many results per search
+_SEARCH_CACHE_TTL = 24 * 60 * 60
+_SEARCH_CACHE_FILE = os.path.join(tempfile.gettempdir(), "yt_search_cache.json")
+_SEARCH_RESULTS = 10
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+# Attempts per search when YouTube answers with a rate limit or server error, and the first retry delay in seconds
+_SEARCH_RETRIES = 4
+_SEARCH_BACKOFF = 1.0
+
+# Original uploads are downloaded into this folder inside the temp folder, keeping the most recently used ones
+_TRACK_CACHE_FOLDER = "tracks"
+_TRACK_CACHE_SIZE = 32
+
+# Workers searching and downloading at once in get_youtube_tracks_async
+_SEARCH_WORKERS = 8
+_DOWNLOAD_WORKERS = 4
+
+# Seconds a search result's length may differ from the track in the mix (VBR lengths are not exact), and the words compared in titles
+_MAX_LENGTH_DIFFERENCE = 2
+_WORD_RE = re.compile(r'\w+')
+
+# ffmpeg input options reading the album art from stdin
+_FFMPEG_COVER_PIPE = ('-f', 'jpeg_pipe', '-i', 'pipe:0')
+
+def _run_ffmpeg(command: list[str], cover: bytes | None = None) -> None:
+    """Runs an ffmpeg command, only keeping its error output.
+    
+    With -loglevel error ffmpeg's stderr stays empty unless something goes wrong.
+    
+    Args:
+        command (list[str]): The ffmpeg command to run
+        cover (bytes, optional): Album art fed to ffmpeg's stdin for commands reading pipe:0. Stdin is closed when not given
+        
+    Raises:
+        Exception: If ffmpeg exits with an error, with ffmpeg's error output as the message
+    """
+    try:
+        if cover is None:
+            subprocess.run(command, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        else:
+            subprocess.run(command, check=True, input=cover, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        raise Exception(e.stderr.decode(errors='replace').strip() or f"ffmpeg exited with code {e.returncode}")
+
+
+async def _run_ffmpeg_async(command: list[str], cover: bytes) -> None:
+    """Asynchronous version of _run_ffmpeg, running ffmpeg without blocking a thread on its output.
+    
+    Args:
+        command (list[str]): The ffmpeg command to run
+        cover (bytes): Album art fed to ffmpeg's stdin for commands reading pipe:0
+        
+    Raises:
+        Exception: If ffmpeg exits with an error, with ffmpeg's error output as the message
+    """
+    process = await asyncio.create_subprocess_exec(*command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+    _, stderr = await process.communicate(cover)
+    if process.returncode:
+        raise Exception(stderr.decode(errors='replace').strip() or f"ffmpeg exited with code {process.returncode}")
+
+
+def _output_file(output_folder: str, title: str) -> str:
+    """Returns the path of the mp3 file for a title. Slashes in the title (e.g. "AC/DC") are replaced so the file stays in output_folder."""
+    return os.path.join(output_folder, f"{_PATH_SEPARATOR_RE.sub('_', title.strip())}.mp3")
+
+
+@functools.lru_cache(maxsize=1)
 def check_ffmpeg() -> bool:
     """Checks if ffmpeg is available on the system.
     
+    The PATH is only searched on the first call, later calls return the cached result.
+    
     Returns:
         bool: True if ffmpeg is available, False otherwise
     """
-    try:
-        subprocess.run(['ffmpeg', '-version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return True
-    except FileNotFoundError:
-        return False
+    return shutil.which('ffmpeg') is not None
+
+
+def warm_up_ffmpeg() -> None:
+    """Runs ffmpeg and ffprobe once so their binaries and libraries are in the OS page cache before the first mix.
+    
+    Call this at startup; the first real split then does not pay for loading them from disk.
+    """
+    for binary in ('ffmpeg', 'ffprobe'):
+        try:
+            subprocess.run([binary, '-version'], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            pass
     
 
 def merge_duplicate_tracks(tracks: list[Track]) -> list[Track]:
@@ -38,37 +151,31 @@ def merge_duplicate_tracks(tracks: list[Track]) -> list[Track]:
     merged = {}
     
     for track in tracks:
-        if track.title in merged:
-            # If we've seen this title before, keep earlier start time
-            existing = merged[track.title]
-            merged[track.title] = Track(
-                track.title,
-                min(existing.start, track.start),
-                track.duration
-            )
-        else:
-            # First time seeing this title
-            merged[track.title] = track
+        # Merge on the title as given, before the track number is removed
+        title = track.title
+        existing = merged.get(title)
+        if existing is None or track.start < existing.start:
+            # First time seeing this title, or this occurrence starts earlier.
+            # Also remove crap from the start of the title. We want to remove 01. or things similar to that
+            track.title = _TRACK_NUMBER_RE.sub('', title)
+            merged[title] = track
             
     # Convert dictionary values back to list
     tracks = list(merged.values())
-
-    # Also remove crap from the start of the file. We want to remove 01. or things similar to that
-    pattern = r'^\d+\.?\s*'
-    for track in tracks:
-        track.title = re.sub(pattern, '', track.title)
     
     return tracks
 
 
-def split_track(audio: str, track: Track, thumbnail: str, output_folder = os.path.join(os.getcwd(), "temp_download")) -> str:
+def split_track(audio: str, track: Track, cover: bytes, output_folder: str | None = None, threads: int = 0, copy_audio: bool | None = None) -> str:
     """Split an audio file into a single track with metadata.
     
     Args:
         audio (str): Path to the input audio file
         track (Track): Track object containing title, start time and duration
-        thumbnail (str): Path to the album art image file
+        cover (bytes): JPEG album art, as returned by crop_thumbnail
         output_folder (str, optional): Directory to save output file. Defaults to current directory + "temp_download"
+        threads (int, optional): Threads ffmpeg may use, 0 lets it decide. Pass 1 when several tracks are split at once. Defaults to 0
+        copy_audio (bool, optional): Whether the audio is mp3 and can be copied instead of encoded. Probed when not given
         
     Returns:
         str: Path to the output mp3 file
@@ -76,122 +183,391 @@ def split_track(audio: str, track: Track, thumbnail: str, output_folder = os.pat
     Raises:
         Exception: If ffmpeg command fails
     """
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    command, output_file = _split_track_command(audio, track, output_folder, threads, copy_audio)
+    
+    # Execute ffmpeg command
+    try:
+        _run_ffmpeg(command, cover)
+    except Exception as e:
+        raise Exception(f"Failed to split track '{track.title}': {str(e)}")
+    
+    return output_file
+
+def _split_track_command(audio: str, track: Track, output_folder: str, threads: int, copy_audio: bool | None) -> tuple[list[str], str]:
+    """Builds the ffmpeg command used by split_track and split_track_async. The album art is read from stdin.
+    
+    Returns:
+        tuple[list[str], str]: The ffmpeg command and the path of the mp3 file it writes
+    """
+    if copy_audio is None:
+        copy_audio = get_audio_codec(audio) == 'mp3'
+
     # Create output filename from track title
-    track_title = track.title
-
-    if " - " in track_title:
-        track_name = track_title.split(" - ", 1)[1].strip()
-        artist = track_title.split(" - ", 1)[0].strip()
-    elif " | " in track_title:
-        track_name = track_title.split(" | ", 1)[1].strip()
-        artist = track_title.split(" | ", 1)[0].strip()
-    else:
-        track_name = track_title
-        artist = track_name
-    output_file = os.path.join(output_folder, f"{track_title.strip()}.mp3")
+    artist, track_name = track.artist_and_name()
+    output_file = _output_file(output_folder, track.title)
     
     # Build ffmpeg command to extract the segment and add metadata
     command = [
-        'ffmpeg',
-        '-y', # Always overwrite
+        *_FFMPEG_BASE,
+        '-ss', str(track.start),  # Seek the audio input so ffmpeg jumps straight to the start instead of decoding up to it
         '-i', audio,  # Input file
-        '-i', thumbnail,  # Album art file
-        '-ss', str(track.start),  # Start time
+        *_FFMPEG_COVER_PIPE,  # Album art, piped in from memory
         '-t', str(track.duration),  # Duration
-        '-c:a', 'libmp3lame',  # Copy without re-encoding
-        '-map', '0:a:0',  # Map the first audio stream
-        '-map', '1:0',  # Map the album art
-        '-map_metadata', '-1',  # Remove existing metadata
+        *_mp3_codec(copy_audio, threads),  # Only encode when the mix is not mp3 already
+        *_FFMPEG_MP3_WITH_COVER,
         '-metadata', f'title={track_name}',  # Add title metadata
         '-metadata', f'artist={artist}',  # Add artist metadata
-        '-id3v2_version', '3',  # Use ID3v2.3 format
-        '-f', 'mp3', # Specify mp3
         output_file
     ]
+    return command, output_file
+
+def _mp3_codec(copy_audio: bool, threads: int) -> list[str]:
+    """Returns the ffmpeg audio codec options for an mp3 output.
     
+    Args:
+        copy_audio (bool): Whether the input is already mp3
+        threads (int): Threads the encoder may use, 0 lets ffmpeg decide
+        
+    Returns:
+        list[str]: A stream copy when the input is already mp3, otherwise a VBR libmp3lame encode
+    """
+    if copy_audio:
+        return ['-c:a', 'copy']
+    return ['-c:a', 'libmp3lame', '-q:a', '2', '-threads', str(threads)]
+
+async def split_track_async(audio: str, track: Track, cover: bytes, output_folder: str | None = None, threads: int = 0, copy_audio: bool | None = None) -> str:
+    """Asynchronous version of split_track, running ffmpeg without blocking a thread on its output.
+    
+    Args:
+        audio (str): Path to the input audio file
+        track (Track): Track object containing title, start time and duration
+        cover (bytes): JPEG album art, as returned by crop_thumbnail
+        output_folder (str, optional): Directory to save output file. Defaults to current directory + "temp_download"
+        threads (int, optional): Threads ffmpeg may use, 0 lets it decide. Pass 1 when several tracks are split at once. Defaults to 0
+        copy_audio (bool, optional): Whether the audio is mp3 and can be copied instead of encoded. Probed when not given
+        
+    Returns:
+        str: Path to the output mp3 file
+        
+    Raises:
+        Exception: If ffmpeg command fails
+    """
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    command, output_file = _split_track_command(audio, track, output_folder, threads, copy_audio)
+
     # Execute ffmpeg command
     try:
-        subprocess.run(command, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to split track '{track.title}': ffmpeg command failed with return code {e.returncode}")
+        await _run_ffmpeg_async(command, cover)
     except Exception as e:
         raise Exception(f"Failed to split track '{track.title}': {str(e)}")
-    
+
     return output_file
 
-def crop_thumbnail(thumbnail: str, output_folder = os.path.join(os.getcwd(), "temp_download")):
-    """Crops the thumbnail from the YouTube video to a 16:9 aspect ratio.
+async def split_tracks_async(audio: str, tracks: list[Track], cover: bytes, output_folder: str | None = None, max_workers: int | None = None, copy_audio: bool | None = None) -> list[str]:
+    """Split several tracks out of an audio file at the same time with split_track_async.
+    
+    By default at most one ffmpeg process per core runs at a time, since each one is encoding.
     
     Args:
-        thumbnail (str): Path to the input thumbnail image file
-        output_folder (str, optional): Directory to save cropped thumbnail. Defaults to current directory + "temp_download"
+        audio (str): Path to the input audio file
+        tracks (list[Track]): List of Track objects containing title, start time and duration
+        cover (bytes): JPEG album art, as returned by crop_thumbnail
+        output_folder (str, optional): Directory to save output files. Defaults to current directory + "temp_download"
+        max_workers (int, optional): Most ffmpeg processes running at once. Defaults to the core count
+        copy_audio (bool, optional): Whether the audio is mp3 and can be copied instead of encoded. Probed when not given
+        
+    Returns:
+        list[str]: List of paths to the output mp3 files, in the same order as tracks
+    """
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    if copy_audio is None:
+        copy_audio = get_audio_codec(audio) == 'mp3'
+    workers = max_workers or os.cpu_count() or 1
+    semaphore = asyncio.Semaphore(workers)
+    # Several processes at once each get one thread, a single one may use them all
+    threads = 1 if len(tracks) > 1 and workers > 1 else 0
+
+    async def run(track: Track) -> str:
+        async with semaphore:
+            return await split_track_async(audio, track, cover, output_folder, threads, copy_audio)
+
+    return list(await asyncio.gather(*(run(track) for track in tracks)))
+
+def split_segments(audio: str, tracks: list[Track], cover: bytes, temp_folder: str | None = None, output_folder: str | None = None, max_workers: int | None = None, copy_audio: bool | None = None) -> list[str]:
+    """Split an audio file into multiple tracks with a single ffmpeg pass, then add metadata to each.
+    
+    Decoding the mix once with the segment muxer replaces one full ffmpeg run per track, and when the mix
+    is already mp3 the audio is copied without re-encoding. Tracks that overlap another track, or that
+    produce no segment, are split individually with split_tracks_async instead.
+    
+    Args:
+        audio (str): Path to the input audio file
+        tracks (list[Track]): List of Track objects containing title, start time and duration
+        cover (bytes): JPEG album art, as returned by crop_thumbnail
+        temp_folder (str, optional): Directory for the intermediate segments. Defaults to current directory + "temp_download"
+        output_folder (str, optional): Directory to save output files. Defaults to current directory + "temp_download"
+        max_workers (int, optional): Most tracks split individually at once. Defaults to the core count
+        copy_audio (bool, optional): Whether the audio is mp3 and can be copied instead of encoded. Probed when not given
+        
+    Returns:
+        list[str]: List of paths to the output mp3 files, in the same order as tracks
+    """
+    if temp_folder is None:
+        temp_folder = _default_folder()
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    if copy_audio is None:
+        copy_audio = get_audio_codec(audio) == 'mp3'
+
+    # A segment can only hold one track, so overlapping tracks are cut on their own
+    segmented = []
+    individual = []
+    end = None
+    for track in sorted(tracks, key=lambda track: track.start):
+        if end is not None and track.start < end:
+            individual.append(track)
+        else:
+            segmented.append(track)
+            end = track.start + track.duration
+
+    songs = {}
+    if segmented:
+        # Cut at every track start and end; segments covering gaps between tracks are simply ignored
+        first = segmented[0].start
+        boundaries = sorted({track.start - first for track in segmented} | {track.start + track.duration - first for track in segmented})
+        segment_folder = tempfile.mkdtemp(dir=_scratch_folder(temp_folder, 2 * os.path.getsize(audio)))
+        segment_pattern = os.path.join(segment_folder, "segment_%04d.mp3")
+
+        command = [
+            *_FFMPEG_BASE,
+            '-ss', str(first),  # Seek to the first track
+            '-i', audio,  # Input file
+            '-t', str(boundaries[-1]),  # Stop after the last track
+            '-map', '0:a:0',  # Map the first audio stream
+            '-map_metadata', '-1',  # Remove existing metadata
+            *_mp3_codec(copy_audio, 0),  # Only process running, so ffmpeg may use every core
+            '-f', 'segment',  # Write one file per segment
+            '-segment_format', 'mp3',
+            '-reset_timestamps', '1',
+        ]
+        if len(boundaries) > 2:
+            command += ['-segment_times', ",".join(str(boundary) for boundary in boundaries[1:-1])]
+        command.append(segment_pattern)
+
+        try:
+            _run_ffmpeg(command)
+
+            segments = []
+            cut_tracks = []
+            for track in segmented:
+                segment = segment_pattern % boundaries.index(track.start - first)
+                if os.path.exists(segment):
+                    segments.append(segment)
+                    cut_tracks.append(track)
+                else:
+                    # Nothing was cut for this track (e.g. it starts past the end of the audio)
+                    individual.append(track)
+
+            for track, song in zip(cut_tracks, tag_segments(segments, cut_tracks, cover, output_folder)):
+                songs[id(track)] = song
+        finally:
+            shutil.rmtree(segment_folder, ignore_errors=True)
+
+    if individual:
+        for track, song in zip(individual, asyncio.run(split_tracks_async(audio, individual, cover, output_folder, max_workers, copy_audio))):
+            songs[id(track)] = song
+
+    return [songs[id(track)] for track in tracks]
+
+
+def _scratch_folder(temp_folder: str, needed: int) -> str:
+    """Returns a folder for short lived intermediate files, preferring memory backed /dev/shm.
+    
+    Args:
+        temp_folder (str): Folder to fall back to
+        needed (int): Number of bytes the intermediate files may take up
         
     Returns:
-        str: Path to the cropped thumbnail file
+        str: /dev/shm if it exists, is writable and has room for needed bytes, otherwise temp_folder
+    """
+    try:
+        stat = os.statvfs(_SHM_FOLDER)
+    except (AttributeError, OSError):
+        # No statvfs on Windows, no /dev/shm on macOS
+        return temp_folder
+    if stat.f_bavail * stat.f_frsize < needed or not os.access(_SHM_FOLDER, os.W_OK):
+        return temp_folder
+    return _SHM_FOLDER
+
+
+def tag_segments(segments: list[str], tracks: list[Track], cover: bytes, output_folder: str | None = None) -> list[str]:
+    """Add metadata and album art to already cut mp3 segments, then move them to the output folder.
+    
+    The tags are written with mutagen, so no ffmpeg process is needed.
+    
+    Args:
+        segments (list[str]): Paths to the mp3 segments
+        tracks (list[Track]): Track objects the segments belong to, in the same order
+        cover (bytes): JPEG album art, as returned by crop_thumbnail
+        output_folder (str, optional): Directory to save output files. Defaults to current directory + "temp_download"
+        
+    Returns:
+        list[str]: List of paths to the output mp3 files, in the same order as segments
         
     Raises:
-        Exception: If image cannot be opened or ffmpeg command fails
+        Exception: If a segment cannot be moved or tagged
     """
-    img = Image.open(thumbnail)
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    output_files = []
+    for segment, track in zip(segments, tracks):
+        output_file = _output_file(output_folder, track.title)
+        try:
+            # Tag before moving, so when the segment is in memory backed scratch space mutagen's
+            # rewrite happens there and the output file is written to disk once
+            tag_mp3(segment, track.title, cover)
+            shutil.move(segment, output_file)
+        except Exception as e:
+            raise Exception(f"Failed to tag track '{track.title}': {str(e)}")
+        output_files.append(output_file)
+
+    return output_files
+
+
+def tag_mp3(audio: str, title: str, cover: bytes) -> None:
+    """Replaces the ID3 tags of an mp3 file with its title, artist and album art.
     
-    width, height = img.width, img.height
+    Args:
+        audio (str): Path to the mp3 file
+        title (str): Track title, split into artist and title with parse_artist_title
+        cover (bytes): JPEG album art
+    """
+    artist, track_name = parse_artist_title(title)
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=track_name))
+    tags.add(TPE1(encoding=3, text=artist))
+    tags.add(_cover_frame(cover))
+    tags.save(audio, v2_version=3)  # Use ID3v2.3 format
+
+
+@functools.lru_cache(maxsize=16)
+def _cover_frame(cover: bytes) -> APIC:
+    """Returns the ID3 album art frame for a cover.
     
-    ratio = width / height
+    Every track of a mix gets the same cover, so one frame is built and shared by all of their tags. Saving only reads it.
+    """
+    return APIC(encoding=3, mime='image/jpeg', type=3, desc='Cover', data=cover)
+
 
-    output_file = os.path.join(output_folder, "new_cover.jpeg")
+def get_audio_codec(audio: str) -> str | None:
+    """Returns the codec of the first audio stream of a file.
     
-    if ratio > 1:
-        # Image is wider than 16:9
-        unit = width / 16
-        new_height = 9 * unit
-        diff = (height - new_height) / 2
+    The result is cached per file and modification time, so every track cut from the same mix shares one probe.
+    
+    Args:
+        audio (str): Path to the audio file
         
-        # Crop to 16:9 from center
-        crop_params = f"crop={int(width)}:{int(new_height)}:0:{int(diff)}"
-        try:
-            subprocess.run([
-                "ffmpeg",
-                '-y', # Always overwrite
-                "-i", thumbnail,
-                "-vf", crop_params,
-                "-c:a", "copy",
-                output_file
-            ], capture_output=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Error cropping thumbnail: {e.stderr.decode()}")
-            raise
-    else:
-        # Image is taller than 16:9
-        unit = height / 9
-        new_width = 16 * unit
-        diff = (width - new_width) / 2
-        
-        # Crop to 16:9 from center
-        crop_params = f"crop={int(new_width)}:{int(height)}:{int(diff)}:0"
-        try:
-            subprocess.run([
-                "ffmpeg",
-                '-y', # Always overwrite
-                "-i", thumbnail,
-                "-vf", crop_params,
-                "-c:a", "copy",
-                output_file
-            ], check=True, capture_output=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Error cropping thumbnail: {e.stderr.decode()}")
-            raise
+    Returns:
+        str | None: Codec name as reported by ffprobe (e.g. "mp3" or "aac"), or None if it could not be probed
+    """
+    try:
+        modified = os.stat(audio).st_mtime_ns
+    except OSError:
+        return None
+    return _probe_audio_codec(os.path.abspath(audio), modified)
 
-    return output_file
+
+@functools.lru_cache(maxsize=64)
+def _probe_audio_codec(audio: str, modified: int) -> str | None:
+    """Runs ffprobe for get_audio_codec. The modification time is only part of the cache key."""
+    try:
+        result = subprocess.run([
+            'ffprobe',
+            '-v', 'error',
+            '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            audio
+        ], stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    return result.stdout.strip() or None
+
+
+def crop_thumbnail(thumbnail: str) -> bytes:
+    """Crops the thumbnail from the YouTube video to a 16:9 aspect ratio.
     
-def split(audio: str, thumbnail: str, tracks: list[Track], temp_folder = os.path.join(os.getcwd(), "temp_download"), output_folder = os.path.join(os.getcwd(), "temp_download")) -> str:
+    The cropped image is kept in memory and handed to mutagen or piped into ffmpeg, so it is never written to disk.
+    It is cached per file, size and modification time, so a thumbnail is only decoded and cropped once.
+    
+    Args:
+        thumbnail (str): Path to the input thumbnail image file
+        
+    Returns:
+        bytes: The cropped image as JPEG
+        
+    Raises:
+        Exception: If image cannot be opened or encoded
+    """
+    stat = os.stat(thumbnail)
+    return _crop_thumbnail(os.path.abspath(thumbnail), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=16)
+def _crop_thumbnail(thumbnail: str, inode: int, size: int, modified: int) -> bytes:
+    """Does the cropping for crop_thumbnail. The inode, size and modification time are only part of the cache key."""
+    with Image.open(thumbnail) as img:
+        width, height = img.width, img.height
+        
+        ratio = width / height
+        
+        if ratio > 1:
+            # Image is wider than 16:9
+            unit = width / 16
+            new_height = 9 * unit
+            diff = (height - new_height) / 2
+            
+            # Crop to 16:9 from center
+            box = (0, int(diff), int(width), int(diff) + int(new_height))
+        else:
+            # Image is taller than 16:9
+            unit = height / 9
+            new_width = 16 * unit
+            diff = (width - new_width) / 2
+            
+            # Crop to 16:9 from center
+            box = (int(diff), 0, int(diff) + int(new_width), int(height))
+
+        cropped = img.crop(box)
+        if cropped.mode != "RGB":
+            # JPEG cannot store alpha or palette images
+            cropped = cropped.convert("RGB")
+        buffer = io.BytesIO()
+        cropped.save(buffer, "JPEG", quality=90, optimize=True)
+
+    return buffer.getvalue()
+    
+def split(audio: str | Future[str], thumbnail: str, tracks: list[Track], temp_folder: str | None = None, output_folder: str | None = None, max_workers: int | None = None, songs_store: ProcessedSongsStore | None = None) -> str:
     """Split an audio file into multiple tracks with metadata.
     
     Args:
-        audio (str): Path to the input audio file
+        audio (str | Future[str]): Path to the input audio file, or a future resolving to it while it is still downloading
         thumbnail (str): Path to the album art image file
         tracks (list[Track]): List of Track objects containing title, start time and duration
-        thumbnail_folder (str, optional): Directory to save the cropped thumbnail. Defaults to current directory + "temp_download"
+        temp_folder (str, optional): Directory for downloads and intermediate files. Defaults to current directory + "temp_download"
         output_folder (str, optional): Directory to save output files. Defaults to current directory + "temp_download"
+        max_workers (int, optional): Most workers per stage while looking for the original uploads, and most tracks cut individually at once.
+            Lower it to throttle when disk or network bound. Defaults to get_youtube_tracks_async's and the core count
+        songs_store (ProcessedSongsStore, optional): Where processed songs are kept. Defaults to the output folder's songs.txt
         
     Returns:
         list[str]: List of paths to the output mp3 files
@@ -199,131 +575,431 @@ def split(audio: str, thumbnail: str, tracks: list[Track], temp_folder = os.path
     Raises:
         Exception: If ffmpeg is not available on the system
     """
+    if temp_folder is None:
+        temp_folder = _default_folder()
+    if output_folder is None:
+        output_folder = _default_folder()
+
     if not check_ffmpeg():
         raise Exception("ffmpeg is not available on the system")
+
+    # Normalise once so every path built from these is clean for the OS and for ffmpeg
+    temp_folder = os.path.normpath(temp_folder)
+    output_folder = os.path.normpath(output_folder)
     
-    tracks = merge_duplicate_tracks(tracks)
-    tracks = check_tracks(tracks, output_folder)
-    thumbnail = crop_thumbnail(thumbnail, temp_folder)
+    # A mix still downloading that ends up not being waited for is discarded below
+    pending = audio if isinstance(audio, Future) else None
+    try:
+        tracks = merge_duplicate_tracks(tracks)
+        tracks = check_tracks(tracks, output_folder, songs_store)
+        cover = crop_thumbnail(thumbnail)
 
-    songs = []
+        # Look for the original uploads first, searching, downloading and encoding different tracks at the same time
+        songs = asyncio.run(get_youtube_tracks_async(tracks, temp_folder, output_folder, max_workers))
 
-    for track in tracks:
-        song = get_youtube_track(track, temp_folder, output_folder)
-        if not song:
-            song = split_track(audio, track, thumbnail, output_folder)
-        songs.append(song)
+        # Everything that was not found is cut from the mix in one go
+        missing = [track for track, song in zip(tracks, songs) if not song]
+        if missing:
+            # The mix may still be downloading; only wait for it once a track has to be cut from it
+            if pending is not None:
+                future, pending = pending, None
+                audio = future.result()
+            # Probe the mix once; every cut from it is a stream copy when it is mp3 already
+            copy_audio = get_audio_codec(audio) == 'mp3'
+            cut = iter(split_segments(audio, missing, cover, temp_folder, output_folder, max_workers, copy_audio))
+            songs = [song if song else next(cut) for song in songs]
+
+        return songs
+    finally:
+        if pending is not None:
+            _discard_audio(pending)
+
+
+def _discard_audio(audio: Future[str]) -> None:
+    """Cancels a mix download nobody waits for, or logs its error when it is already running and fails."""
+    if audio.cancel():
+        return
+
+    def log_error(future: Future[str]) -> None:
+        if future.exception() is not None:
+            print(f"Background audio download failed: {str(future.exception())}")
+    audio.add_done_callback(log_error)
 
-    return songs
 
+def _parse_length(text: str | None) -> int | None:
+    """Converts a YouTube length such as "3:45" or "1:02:03" into seconds, None when missing (e.g. live streams)."""
+    if not text:
+        return None
+    seconds = 0
+    for part in text.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds
 
-def get_youtube_track(track: Track, temp_folder = os.path.join(os.getcwd(), "temp_download"), output_folder = os.path.join(os.getcwd(), "temp_download")) -> str:
-    results = Search(track.title).videos
-    arr = []
-    for i in range(5):
-        similarity = SequenceMatcher(None, results[i].title, track.title).ratio()
-        arr.append((results[i], similarity))
+
+def _parse_search_results(raw: dict) -> list[dict]:
+    """Pulls the first videos out of a raw innertube search response.
+    
+    Ads, shelves, playlists and channels are skipped.
     
-    arr = sorted(arr, key=lambda x: x[1])
+    Args:
+        raw (dict): JSON returned by Search.fetch_query
+        
+    Returns:
+        list[dict]: Up to _SEARCH_RESULTS videos, each with video_id, title, thumbnail_url and length
+    """
+    sections = (raw.get('contents', {})
+                .get('twoColumnSearchResultsRenderer', {})
+                .get('primaryContents', {})
+                .get('sectionListRenderer', {})
+                .get('contents', []))
+    results = []
+    for section in sections:
+        for item in section.get('itemSectionRenderer', {}).get('contents', []):
+            video = item.get('videoRenderer')
+            if video is None:
+                continue
+            video_id = video['videoId']
+            thumbnails = video.get('thumbnail', {}).get('thumbnails')
+            results.append({
+                'video_id': video_id,
+                'title': "".join(run['text'] for run in video.get('title', {}).get('runs', [])),
+                'thumbnail_url': thumbnails[-1]['url'] if thumbnails else f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                'length': _parse_length(video.get('lengthText', {}).get('simpleText')),
+            })
+            if len(results) == _SEARCH_RESULTS:
+                return results
+    return results
 
-    result = arr[-1][0]
-    similarity = arr[-1][1]
 
-    if similarity < 0.6:
+def search_youtube(query: str) -> list[dict]:
+    """Searches YouTube for videos, keeping the results on disk for a day.
+    
+    Repeated titles, within a mix or across mixes, skip the search entirely.
+    Set YT_SEARCH_CACHE_DISABLE=1 to always search.
+    
+    Args:
+        query (str): Text to search for
+        
+    Returns:
+        list[dict]: The first results, each with video_id, title, thumbnail_url and length
+    """
+    use_cache = os.getenv('YT_SEARCH_CACHE_DISABLE') != '1'
+    key = " ".join(query.lower().split())
+
+    if use_cache:
+        with _search_cache_lock:
+            entry = _load_search_cache().get(key)
+        if entry is not None and time.time() - entry['time'] < _SEARCH_CACHE_TTL:
+            return entry['results']
+
+    # Tracks are searched side by side, so YouTube may start rate limiting; back off and retry when it does
+    for attempt in range(_SEARCH_RETRIES):
+        try:
+            # One innertube request carries everything we need, unlike Search.videos which fetches each video page
+            results = _parse_search_results(Search(query).fetch_query())
+            break
+        except HTTPError as e:
+            if attempt == _SEARCH_RETRIES - 1 or (e.code != 429 and e.code < 500):
+                raise
+            # Exponential backoff, with jitter so parallel searches do not retry in lockstep
+            delay = _SEARCH_BACKOFF * 2 ** attempt
+            delay += random.uniform(0, delay)
+            print(f"Search for '{query}' failed with HTTP {e.code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    if use_cache:
+        with _search_cache_lock:
+            cache = _load_search_cache()
+            now = time.time()
+            cache[key] = {'time': now, 'results': results}
+            # Drop expired searches so the file does not grow forever
+            for stale in [k for k, v in cache.items() if now - v['time'] >= _SEARCH_CACHE_TTL]:
+                del cache[stale]
+            _save_search_cache(cache)
+
+    return results
+
+
+def _load_search_cache() -> dict:
+    """Returns the search cache, reading it from disk on first use. Call with _search_cache_lock held."""
+    global _search_cache
+    if _search_cache is None:
+        try:
+            with open(_SEARCH_CACHE_FILE, 'r', encoding='utf-8') as f:
+                _search_cache = json.load(f)
+        except (OSError, ValueError):
+            _search_cache = {}
+    return _search_cache
+
+
+def _save_search_cache(cache: dict) -> None:
+    """Writes the search cache to disk. Call with _search_cache_lock held."""
+    try:
+        with open(_SEARCH_CACHE_FILE + ".part", 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(_SEARCH_CACHE_FILE + ".part", _SEARCH_CACHE_FILE)
+    except OSError as e:
+        # The cache only saves time, a failed write must not fail the track
+        print(f"Could not save search cache: {e}")
+
+
+def title_similarity(title: str, candidate: str) -> float:
+    """Returns the share of the words in title that also appear in candidate (a modified Jaccard similarity).
+    
+    Args:
+        title (str): Title of the track being looked for
+        candidate (str): Title of a search result
+        
+    Returns:
+        float: From 0 when no words are shared to 1 when every word of title is in candidate
+    """
+    words = _title_words(title)
+    if not words:
+        return 0.0
+    return len(words & _title_words(candidate)) / len(words)
+
+
+@functools.lru_cache(maxsize=256)
+def _title_words(title: str) -> frozenset[str]:
+    """Lowercased words of a title, cached so a track's title is only split once while its results are scored."""
+    return frozenset(_WORD_RE.findall(title.lower()))
+
+
+def get_youtube_track(track: Track, temp_folder: str | None = None, output_folder: str | None = None) -> str | None:
+    """Looks for the original upload of a track on YouTube and saves it as a tagged mp3.
+    
+    Args:
+        track (Track): Track to look for
+        temp_folder (str, optional): Directory for the downloads. Defaults to current directory + "temp_download"
+        output_folder (str, optional): Directory to save the mp3 file. Defaults to current directory + "temp_download"
+        
+    Returns:
+        str | None: Path to the output mp3 file, or None if no good match was found
+        
+    Raises:
+        Exception: If the download cannot be converted or tagged
+    """
+    if temp_folder is None:
+        temp_folder = _default_folder()
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    result = _find_youtube_result(track)
+    if result is None:
         return
+    audio, cover = _download_youtube_result(result, temp_folder)
+
+    output_file = _output_file(output_folder, result['title'])
+    try:
+        if get_audio_codec(audio) == 'mp3':
+            _copy_and_tag(audio, output_file, result['title'], cover)
+        else:
+            _run_ffmpeg(_youtube_track_command(audio, result['title'], output_file), cover)
+    except Exception as e:
+        raise Exception(f"Failed to split track '{track.title}': {str(e)}")
     
-    audio = download_audio(result, temp_folder)
-    thumbnail = download_thumbnail(result.thumbnail_url, temp_folder)
-    thumbnail = crop_thumbnail(thumbnail, temp_folder)
+    return output_file
 
-    # Create output filename from track title
-    track_title = result.title
-
-    if " - " in track_title:
-        track_name = track_title.split(" - ", 1)[1].strip()
-        artist = track_title.split(" - ", 1)[0].strip()
-    elif " | " in track_title:
-        track_name = track_title.split(" | ", 1)[1].strip()
-        artist = track_title.split(" | ", 1)[0].strip()
-    else:
-        track_name = track_title
-        artist = track_name
-    output_file = os.path.join(output_folder, f"{track_title.strip()}.mp3")
+
+def _find_youtube_result(track: Track) -> dict | None:
+    """Searches YouTube for a track and returns the result that best matches it, or None if none is close enough."""
+    results = search_youtube(track.title)
+
+    # The original upload should be about as long as the track in the mix, so drop the rest before comparing any titles
+    candidates = [candidate for candidate in results
+                  if not candidate['length'] or abs(candidate['length'] - track.duration) <= _MAX_LENGTH_DIFFERENCE]
+    print(f"Checked {len(results)} results for '{track.title}', filtered to {len(candidates)} by duration")
+    if not candidates:
+        return
+
+    result = None
+    similarity = 0
+    for candidate in candidates:
+        candidate_similarity = title_similarity(track.title, candidate['title'])
+        if candidate_similarity > similarity:
+            result, similarity = candidate, candidate_similarity
+            if similarity >= 0.9:
+                # Close enough, no need to score the rest
+                break
+
+    if similarity < 0.6:
+        return
+    return result
+
+
+def _download_youtube_result(result: dict, temp_folder: str) -> tuple[str, bytes]:
+    """Downloads the audio and thumbnail of a search result, returning the audio path and the cropped cover."""
+    # Download into a folder of its own so tracks processed in parallel do not overwrite each other's files
+    temp_folder = os.path.join(temp_folder, _TRACK_CACHE_FOLDER, result['video_id'])
+    use_cache_folder(temp_folder)
+
+    # Downloads only land under their final names once complete, so whatever is already in the folder
+    # from an earlier mix using the same video can be reused as is
+    audio = os.path.join(temp_folder, "audio.mp3")
+    if not os.path.exists(audio):
+        video = YouTube(f"https://www.youtube.com/watch?v={result['video_id']}")
+        audio = download_audio(video, temp_folder)
+    thumbnail = os.path.join(temp_folder, "cover.jpeg")
+    if not os.path.exists(thumbnail):
+        thumbnail = download_thumbnail(result['thumbnail_url'], temp_folder)
+    # Keep the folder from growing forever in a long running service
+    prune_cache(os.path.dirname(temp_folder), _TRACK_CACHE_SIZE)
+    return audio, crop_thumbnail(thumbnail)
+
+
+def _copy_and_tag(audio: str, output_file: str, title: str, cover: bytes) -> None:
+    """Copies an mp3 download to the output and tags it, so ffmpeg is not needed at all.
     
-    # Build ffmpeg command to extract the segment and add metadata
-    command = [
-        'ffmpeg',
-        '-y', # Always overwrite
+    Copy rather than move, the download is kept for later mixes using the same video.
+    """
+    shutil.copyfile(audio, output_file)
+    tag_mp3(output_file, title, cover)
+
+
+def _youtube_track_command(audio: str, title: str, output_file: str) -> list[str]:
+    """Builds the ffmpeg command encoding a download that is not mp3 yet. The album art is read from stdin."""
+    artist, track_name = parse_artist_title(title)
+    return [
+        *_FFMPEG_BASE,
         '-i', audio,  # Input file
-        '-i', thumbnail,  # Album art file
-        '-c:a', 'libmp3lame',  # Copy without re-encoding
-        '-map', '0:a:0',  # Map the first audio stream
-        '-map', '1:0',  # Map the album art
-        '-map_metadata', '-1',  # Remove existing metadata
+        *_FFMPEG_COVER_PIPE,  # Album art, piped in from memory
+        '-c:a', 'libmp3lame', '-q:a', '2',  # Encode to VBR mp3
+        '-threads', '1',  # Tracks are processed in parallel, one thread each avoids oversubscribing the cores
+        *_FFMPEG_MP3_WITH_COVER,
         '-metadata', f'title={track_name}',  # Add title metadata
         '-metadata', f'artist={artist}',  # Add artist metadata
-        '-id3v2_version', '3',  # Use ID3v2.3 format
-        '-f', 'mp3', # Specify mp3
         output_file
     ]
+
+
+async def get_youtube_tracks_async(tracks: list[Track], temp_folder: str | None = None, output_folder: str | None = None, max_workers: int | None = None) -> list[str | None]:
+    """Runs get_youtube_track for several tracks as a pipeline of searches, downloads and encodes.
     
-    # Execute ffmpeg command
-    try:
-        subprocess.run(command, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to split track '{track.title}': ffmpeg command failed with return code {e.returncode}")
-    except Exception as e:
-        raise Exception(f"Failed to split track '{track.title}': {str(e)}")
+    Each stage has its own workers, connected by queues, so searching and downloading (network bound)
+    overlap with encoding (CPU bound) instead of each track doing the three one after the other.
+    The queues between the stages are bounded, so searches wait when downloads fall behind.
+    A track whose search, download or encode fails is logged and left out, so split cuts it from the mix instead.
     
-    return output_file
+    Args:
+        tracks (list[Track]): Tracks to look for
+        temp_folder (str, optional): Directory for the downloads. Defaults to current directory + "temp_download"
+        output_folder (str, optional): Directory to save the mp3 files. Defaults to current directory + "temp_download"
+        max_workers (int, optional): Most workers per stage. By default 8 searches, 4 downloads and one encode per core
+        
+    Returns:
+        list[str | None]: Path to each output mp3 file, or None for the tracks without a good match or that failed, in the same order as tracks
+    """
+    if temp_folder is None:
+        temp_folder = _default_folder()
+    if output_folder is None:
+        output_folder = _default_folder()
+
+    songs = [None] * len(tracks)
+    if not tracks:
+        return songs
+
+    def workers(default: int) -> int:
+        return max(1, min(len(tracks), default, max_workers or default))
+    search_workers = workers(_SEARCH_WORKERS)
+    download_workers = workers(_DOWNLOAD_WORKERS)
+    encode_workers = workers(os.cpu_count() or 1)
+
+    # Searches and downloads block in pytubefix, so every worker gets a thread of its own to run them in
+    executor = ThreadPoolExecutor(max_workers=search_workers + download_workers + encode_workers)
+    run = functools.partial(asyncio.get_running_loop().run_in_executor, executor)
+
+    searches = asyncio.Queue()
+    downloads = asyncio.Queue(maxsize=download_workers)
+    encodes = asyncio.Queue(maxsize=encode_workers)
+    for item in enumerate(tracks):
+        searches.put_nowait(item)
+
+    async def search() -> None:
+        while True:
+            index, track = await searches.get()
+            try:
+                result = await run(_find_youtube_result, track)
+            except Exception as e:
+                # Only this track is affected, it is cut from the mix instead
+                print(f"Search for '{track.title}' failed, cutting it from the mix: {str(e)}")
+                result = None
+            try:
+                if result is not None:
+                    await downloads.put((index, track, result))
+            finally:
+                searches.task_done()
+
+    async def download() -> None:
+        while True:
+            index, track, result = await downloads.get()
+            try:
+                try:
+                    audio, cover = await run(_download_youtube_result, result, temp_folder)
+                    copy_audio = await run(get_audio_codec, audio) == 'mp3'
+                except Exception as e:
+                    print(f"Download of '{result['title']}' for '{track.title}' failed, cutting it from the mix: {str(e)}")
+                    continue
+                await encodes.put((index, track, result, audio, cover, copy_audio))
+            finally:
+                downloads.task_done()
 
+    async def encode() -> None:
+        while True:
+            index, track, result, audio, cover, copy_audio = await encodes.get()
+            try:
+                output_file = _output_file(output_folder, result['title'])
+                try:
+                    if copy_audio:
+                        await run(_copy_and_tag, audio, output_file, result['title'], cover)
+                    else:
+                        await _run_ffmpeg_async(_youtube_track_command(audio, result['title'], output_file), cover)
+                except Exception as e:
+                    print(f"Failed to split track '{track.title}', cutting it from the mix: {str(e)}")
+                    # Do not leave a half written file behind
+                    if os.path.exists(output_file):
+                        os.remove(output_file)
+                    continue
+                songs[index] = output_file
+            finally:
+                encodes.task_done()
 
-def check_tracks(tracks: list[Track], output_folder: str) -> list[Track]:
-    """Check if there is a songs.txt file in the output folder and return filtered tracks.
-    If the file doesn't exist, create it with current songs in the folder.
-    Then append any new songs that will be processed.
+    # An unexpected error in a worker cancels the others and the wait below, so it is raised instead of hanging
+    with executor:
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(worker()) for worker, count in
+                         ((search, search_workers), (download, download_workers), (encode, encode_workers)) for _ in range(count)]
+                # Every stage is only done once the one feeding it is
+                for queue in (searches, downloads, encodes):
+                    await queue.join()
+                for task in tasks:
+                    task.cancel()
+        except ExceptionGroup as group:
+            # Raise the worker's own error, its message is what the caller logs
+            raise group.exceptions[0] from None
+
+    return songs
+
+
+def check_tracks(tracks: list[Track], output_folder: str, songs_store: ProcessedSongsStore | None = None) -> list[Track]:
+    """Return the tracks that haven't been processed into the output folder yet, and mark them as processed.
+    By default the processed songs are kept in a songs.txt file in the output folder. If the file doesn't
+    exist, it is created with the current songs in the folder.
     
     Args:
         tracks (list[Track]): List of Track objects to check
         output_folder (str): Directory to check for songs.txt
+        songs_store (ProcessedSongsStore, optional): Where processed songs are kept. Defaults to the output folder's songs.txt
         
     Returns:
         list[Track]: List of tracks that haven't been processed yet
     """
-    songs_file = os.path.join(output_folder, "songs.txt")
-    
-    # If songs.txt doesn't exist, create it with current songs in the folder
-    if not os.path.exists(songs_file):
-        # Get all MP3 files in the output folder
-        existing_songs = set()
-        for file in os.listdir(output_folder):
-            if file.endswith('.mp3'):
-                # Remove the .mp3 extension to get the song title
-                song_title = os.path.splitext(file)[0]
-                existing_songs.add(song_title)
-        
-        # Write existing songs to the file
-        if existing_songs:
-            with open(songs_file, 'w', encoding='utf-8') as f:
-                for song in existing_songs:
-                    f.write(f"{song}\n")
-    
-    # Read processed songs from file (whether it existed before or we just created it)
-    processed_songs = set()
-    if os.path.exists(songs_file):
-        with open(songs_file, 'r', encoding='utf-8') as f:
-            processed_songs = set(line.strip() for line in f)
-        
+    if songs_store is None:
+        songs_store = ProcessedSongsStore(output_folder)
+
     # Filter out tracks that have already been processed
-    new_tracks = [track for track in tracks if track.title not in processed_songs]
-    
-    # Append new tracks to the songs file
-    if new_tracks:
-        with open(songs_file, 'a', encoding='utf-8') as f:
-            for track in new_tracks:
-                f.write(f"{track.title}\n")
-    
-    return new_tracks
+    new_titles = songs_store.add_many(track.title for track in tracks)
+    return [track for track in tracks if track.title in new_titles]
         
     
 
@@ -377,10 +1053,10 @@ def test_split_track():
     """Test the split_track function."""
     try:
         # Create test files and directories
-        test_dir = os.getcwd() + "\\test\\"
-        input_file = test_dir + "audio.mp3"
-        output_dir = test_dir + "output\\"
-        thumbnail = test_dir + "cover.jpeg"
+        test_dir = os.path.join(os.getcwd(), "test")
+        input_file = os.path.join(test_dir, "audio.mp3")
+        output_dir = os.path.join(test_dir, "output")
+        thumbnail = os.path.join(test_dir, "cover.jpeg")
         
         # Ensure test directories exist
         os.makedirs(os.path.dirname(input_file), exist_ok=True)
@@ -390,7 +1066,7 @@ def test_split_track():
         subprocess.run([
             'ffmpeg', '-y', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=5',
             '-c:a', 'mp3', '-b:a', '192k', input_file
-        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        ], check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
         # Create a test thumbnail
         test_image = Image.new('RGB', (100, 100), color='red')
@@ -400,7 +1076,7 @@ def test_split_track():
         track = Track("Test Artist - Test Song", 0, 30)
             
         # Test split
-        output_file = split_track(input_file, track, thumbnail, output_dir)
+        output_file = split_track(input_file, track, crop_thumbnail(thumbnail), output_dir)
         
         # Verify output file exists
         assert os.path.exists(output_file), "Output file was not created"
@@ -421,33 +1097,29 @@ def test_crop_thumbnail():
     """Test the crop_thumbnail function."""
     try:
         # Test case 1: Basic crop
-        input_file = os.getcwd() + "\\test\\cover_test.jpeg"
-        output_dir = os.getcwd() + "\\test\\output\\"
+        input_file = os.path.join(os.getcwd(), "test", "cover_test.jpeg")
         
         # Ensure test directories exist
         os.makedirs(os.path.dirname(input_file), exist_ok=True)
-        os.makedirs(output_dir, exist_ok=True)
         
         # Create a test image
         test_image = Image.new('RGB', (1200, 800), color='red')
         test_image.save(input_file)
         
         # Test crop
-        output_file = crop_thumbnail(input_file, output_dir)
+        cover = crop_thumbnail(input_file)
         
-        # Verify output file exists and is correct size
-        assert os.path.exists(output_file), "Output file was not created"
-        assert os.path.getsize(output_file) > 0, "Output file is empty"
+        # Verify an image came back and is correct size
+        assert len(cover) > 0, "Cropped image is empty"
         
-        # Verify dimensions are square
-        with Image.open(output_file) as img:
+        # Verify dimensions are 16:9
+        with Image.open(io.BytesIO(cover)) as img:
             width, height = img.size
             assert width == 1200, "Output image width should be same"
-            assert height == 674, "Output image height should be shorter, was " + str(height)
+            assert height == 675, "Output image height should be shorter, was " + str(height)
         
         # Clean up
         os.remove(input_file)
-        os.remove(output_file)
         
         print("crop_thumbnail test passed successfully!")
         
@@ -459,10 +1131,9 @@ def test_split():
     """Test the split function."""
     try:
         # Test case 1: Basic split
-        input_file = os.getcwd() + "\\test\\test_audio.wav"
-        thumbnail = os.getcwd() + "\\test\\test_thumb.jpg"
-        new_thumbnail = os.getcwd() + "\\test\\output\\new_cover.jpeg"
-        output_dir = os.getcwd() + "\\test\\output\\"
+        input_file = os.path.join(os.getcwd(), "test", "test_audio.wav")
+        thumbnail = os.path.join(os.getcwd(), "test", "test_thumb.jpg")
+        output_dir = os.path.join(os.getcwd(), "test", "output")
         tracks1 = [
             Track("Song 1", 0, 60),
             Track("Song 2", 60, 60)
@@ -477,9 +1148,7 @@ def test_split():
             f.setnchannels(1)
             f.setsampwidth(2)
             f.setframerate(44100)
-            for i in range(44100):  # 1 second of audio
-                value = struct.pack('h', int(32767.0*0.5))
-                f.writeframes(value)
+            f.writeframes(struct.pack('<h', int(32767.0*0.5)) * 44100)  # 1 second of audio in one write
         
         # Create test thumbnail
         test_image = Image.new('RGB', (1200, 800), color='red')
@@ -495,12 +1164,9 @@ def test_split():
             assert os.path.exists(file), f"Output file {file} was not created"
             assert os.path.getsize(file) > 0, f"Output file {file} is empty"
         
-        assert os.path.exists(new_thumbnail), "Thumbnail wasnt converted"
-        
         # Clean up
         os.remove(input_file)
         os.remove(thumbnail)
-        os.remove(new_thumbnail)
         for file in output_files:
             os.remove(file)
         
@@ -570,6 +1236,91 @@ def test_check_tracks():
         print(f"Test failed: {str(e)}")
         raise
 
+def test_parse_search_results():
+    """Test the _parse_search_results and _parse_length functions."""
+    try:
+        def video(video_id, title_runs, length=None, thumbnails=None):
+            renderer = {'videoId': video_id, 'title': {'runs': [{'text': text} for text in title_runs]}}
+            if length:
+                renderer['lengthText'] = {'simpleText': length}
+            if thumbnails:
+                renderer['thumbnail'] = {'thumbnails': [{'url': url} for url in thumbnails]}
+            return {'videoRenderer': renderer}
+
+        # Minimal innertube search response: an ad, a shelf and a continuation around three videos
+        raw = {'contents': {'twoColumnSearchResultsRenderer': {'primaryContents': {'sectionListRenderer': {'contents': [
+            {'itemSectionRenderer': {'contents': [
+                {'searchPyvRenderer': {'ads': []}},
+                video('id1', ['Artist - ', 'Song'], '3:45', ['small.jpg', 'large.jpg']),
+                {'shelfRenderer': {'title': {'simpleText': 'People also watched'}}},
+                video('id2', ['Live Set']),
+            ]}},
+            {'itemSectionRenderer': {'contents': [video('id3', ['Long Mix'], '1:02:03')]}},
+            {'continuationItemRenderer': {}},
+        ]}}}}}
+
+        results = _parse_search_results(raw)
+        assert [result['video_id'] for result in results] == ['id1', 'id2', 'id3'], "Only videos should be returned, in order"
+        assert results[0] == {'video_id': 'id1', 'title': 'Artist - Song', 'thumbnail_url': 'large.jpg', 'length': 225}, "Title runs should be joined and the largest thumbnail used"
+        assert results[1]['length'] is None, "A video without lengthText should have no length"
+        assert results[1]['thumbnail_url'] == "https://i.ytimg.com/vi/id2/hqdefault.jpg", "A video without thumbnails should fall back to the default one"
+        assert results[2]['length'] == 3723, "h:mm:ss lengths should be converted to seconds"
+
+        # Never more than _SEARCH_RESULTS, and nothing at all for an unexpected response
+        many = {'contents': {'twoColumnSearchResultsRenderer': {'primaryContents': {'sectionListRenderer': {'contents': [
+            {'itemSectionRenderer': {'contents': [video(f'id{i}', ['Song'], '3:00') for i in range(_SEARCH_RESULTS + 5)]}},
+        ]}}}}}
+        assert len(_parse_search_results(many)) == _SEARCH_RESULTS, "Results should be capped at _SEARCH_RESULTS"
+        assert _parse_search_results({}) == [], "An empty response should give no results"
+
+        assert _parse_length("0:07") == 7, "Seconds only should be parsed"
+        assert _parse_length(None) is None and _parse_length("") is None, "A missing length should give None"
+
+        print("parse_search_results test passed successfully!")
+
+    except Exception as e:
+        print(f"Test failed: {str(e)}")
+        raise
+
+def test_title_similarity():
+    """Test the title_similarity and _find_youtube_result functions."""
+    global search_youtube
+    original_search = search_youtube
+    try:
+        # Share of the title's words found in the candidate, ignoring case and punctuation
+        assert title_similarity("Artist - Song", "artist song (Official Video)") == 1.0, "Every word should be found"
+        assert title_similarity("Artist - Song", "Artist - Other") == 0.5, "Half the words should be found"
+        assert title_similarity("", "Artist - Song") == 0.0, "An empty title should match nothing"
+
+        def result(video_id, title, length):
+            return {'video_id': video_id, 'title': title, 'thumbnail_url': '', 'length': length}
+
+        def find(results, title="a b c d e f g h i j", duration=200):
+            global search_youtube
+            search_youtube = lambda query: results
+            return _find_youtube_result(Track(title, 0, duration))
+
+        exact = "a b c d e f g h i j"
+        # 0.6 is the lowest similarity accepted
+        assert find([result('low', "a b c d e", 200)]) is None, "0.5 similarity should be rejected"
+        assert find([result('edge', "a b c d e f", 200)])['video_id'] == 'edge', "0.6 similarity should be accepted"
+        # The best result wins, but one scoring 0.9 or more ends the search
+        assert find([result('ok', "a b c d e f g", 200), result('best', exact, 200)])['video_id'] == 'best', "The best match should be picked"
+        assert find([result('close', "a b c d e f g h i", 200), result('best', exact, 200)])['video_id'] == 'close', "A 0.9 match should stop the search"
+        # Results more than _MAX_LENGTH_DIFFERENCE seconds off are dropped before scoring, unknown lengths are kept
+        assert find([result('long', exact, 200 + _MAX_LENGTH_DIFFERENCE + 1)]) is None, "A result of another length should be rejected"
+        assert find([result('near', exact, 200 - _MAX_LENGTH_DIFFERENCE)])['video_id'] == 'near', "A length within the tolerance should be accepted"
+        assert find([result('live', exact, None)])['video_id'] == 'live', "A result without a length should be kept"
+        assert find([]) is None, "No results should give no match"
+
+        print("title_similarity test passed successfully!")
+
+    except Exception as e:
+        print(f"Test failed: {str(e)}")
+        raise
+    finally:
+        search_youtube = original_search
+
 def main():
     get_youtube_track(Track('Benlon, Pop Mage - Memories', 0, 0))
 
@@ -580,5 +1331,7 @@ if __name__ == "__main__":
     test_crop_thumbnail()
     test_split()
     test_check_tracks()
+    test_parse_search_results()
+    test_title_similarity()
 
     main()
@@ -1,4 +1,4 @@
-import json
+import orjson
 
 from redis_pub_sub import RedisPublisher, RedisSubscriber
 
@@ -10,7 +10,7 @@ def process_message(message: dict) -> None:
 
     try:
         # Parse the JSON message data into a Python dictionary
-        data = json.loads(message['data'])
+        data = orjson.loads(message['data'])
         # Extract video URL and songs list from the message
         video_url = data.get('video_url')
         songs = data.get('songs')
@@ -19,7 +19,7 @@ def process_message(message: dict) -> None:
         print(f"Processed video: {video_url}")
         print(f"Processed songs: {songs}")
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         # Handle malformed JSON data
         print(f"Error: Invalid JSON message received: {message['data']}")
     except Exception as e:
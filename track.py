@@ -1,4 +1,18 @@
+import re
+
+# Bracketed "feat. Artist" credit, or an unbracketed one at the end of the title
+_FEAT_RE = re.compile(r'\s*[\(\[]\s*(?:feat\.?|ft\.|featuring)\s+([^\)\]]+?)\s*[\)\]]|\s+(?:feat\.?|ft\.|featuring)\s+(.+)$', re.IGNORECASE)
+
+# Upload noise that is not part of the song name: "(Official Music Video)", "[HD]", "(2011 Remaster)", or a trailing HD or Remastered
+_NOISE_RE = re.compile(
+    r'\s*[\(\[][^\)\]]*\b(?:official|lyrics?|audio|video|visuali[sz]er|hd|hq|4k|remaster(?:ed)?)\b[^\)\]]*[\)\]]'
+    r'|\s+(?:HD|HQ|(?:\d{4}\s+)?remaster(?:ed)?(?:\s+\d{4})?)$',
+    re.IGNORECASE
+)
+
 class Track:
+    __slots__ = ('title', 'start', 'duration')
+
     def __init__(self, title: str, start: int, duration: int) -> None:
         self.title = title
         self.start = start
@@ -8,4 +22,65 @@ class Track:
         return f"{self.title} ({self.start} - {self.duration})"
     
     def __repr__(self):
-        return str(self)
\ No newline at end of file
+        return str(self)
+
+    def artist_and_name(self) -> tuple[str, str]:
+        """Returns the artist and song name in this track's title, see parse_artist_title."""
+        return parse_artist_title(self.title)
+
+
+def parse_artist_title(title: str) -> tuple[str, str]:
+    """Splits a title in the form "Artist - Title" or "Artist | Title" into the artist and the song name.
+    
+    Upload noise such as "(Official Video)", "[HD]" or "Remastered" is dropped, and a "feat." credit in the
+    song name is moved to the artist.
+    
+    Args:
+        title (str): Title to split
+        
+    Returns:
+        tuple[str, str]: The artist and the song name. Both are the whole (cleaned) title if there is no separator
+    """
+    # partition stops at the first separator, " - " takes priority over " | "
+    for separator in (' - ', ' | '):
+        artist, found, name = title.partition(separator)
+        if found:
+            break
+    else:
+        artist = name = title
+
+    cleaned = _NOISE_RE.sub('', name).strip()
+    name = cleaned or name.strip()
+    artist = _NOISE_RE.sub('', artist).strip() or artist.strip()
+
+    feat = _FEAT_RE.search(name)
+    if feat and found:
+        name = (name[:feat.start()] + name[feat.end():]).strip()
+        artist = f"{artist} feat. {(feat.group(1) or feat.group(2)).strip()}"
+    return artist, name
+
+
+def test_parse_artist_title():
+    """Test the parse_artist_title function."""
+    try:
+        assert parse_artist_title("Artist - Song") == ("Artist", "Song"), "Should split on ' - '"
+        assert parse_artist_title("Artist | Song - Remix") == ("Artist | Song", "Remix"), "' - ' should take priority over ' | '"
+        assert parse_artist_title("Artist | Song") == ("Artist", "Song"), "Should split on ' | '"
+        assert parse_artist_title("Song") == ("Song", "Song"), "Without a separator both should be the title"
+        assert parse_artist_title("Artist - Song (Official Music Video) [HD]") == ("Artist", "Song"), "Should drop upload noise"
+        assert parse_artist_title("Artist - Song (2011 Remaster)") == ("Artist", "Song"), "Should drop remaster notes"
+        assert parse_artist_title("Artist - Song (feat. Other)") == ("Artist feat. Other", "Song"), "Should move feat. to the artist"
+        assert parse_artist_title("Artist - Song ft. Other") == ("Artist feat. Other", "Song"), "Should move a trailing ft. to the artist"
+        assert parse_artist_title("Artist - Song Remastered 2011") == ("Artist", "Song"), "Should drop a trailing remaster note"
+        assert parse_artist_title("Artist - Remastered Heart") == ("Artist", "Remastered Heart"), "Should keep words that are part of the song"
+        assert parse_artist_title("Artist - Song (Remix)") == ("Artist", "Song (Remix)"), "Should keep versions that are part of the song"
+
+        print("parse_artist_title test passed successfully!")
+
+    except Exception as e:
+        print(f"Test failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    test_parse_artist_title()